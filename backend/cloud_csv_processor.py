@@ -2,7 +2,7 @@ import pandas as pd
 import requests
 from typing import Optional, List
 import io
-from urllib.parse import urlparse
+from http_client import fetch, download_error_type
 
 def count_states_from_url(url: str, state_column: str = 'state') -> int:
     """
@@ -21,11 +21,10 @@ def count_states_from_url(url: str, state_column: str = 'state') -> int:
             url = convert_google_drive_url(url)
         
         # Download the CSV file
-        response = requests.get(url)
-        response.raise_for_status()
+        response = fetch(url)
         
         # Read CSV from the response content
-        df = pd.read_csv(io.StringIO(response.text))
+        df = pd.read_csv(io.BytesIO(response.content))
         
         # Check if the state column exists
         if state_column not in df.columns:
@@ -57,11 +56,10 @@ def get_state_list_from_url(url: str, state_column: str = 'state') -> List[str]:
             url = convert_google_drive_url(url)
         
         # Download the CSV file
-        response = requests.get(url)
-        response.raise_for_status()
+        response = fetch(url)
         
         # Read CSV from the response content
-        df = pd.read_csv(io.StringIO(response.text))
+        df = pd.read_csv(io.BytesIO(response.content))
         
         # Check if the state column exists
         if state_column not in df.columns:
@@ -95,7 +93,7 @@ def convert_google_drive_url(share_url: str) -> str:
         
         # Create direct download URL
         return f"https://drive.google.com/uc?export=download&id={file_id}"
-    except:
+    except IndexError:
         return share_url  # Return original URL if conversion fails
 
 def process_csv_from_cloud(
@@ -126,11 +124,16 @@ def process_csv_from_cloud(
                 processed_url = url.replace('?dl=0', '?dl=1')
         
         # Download and process the file
-        response = requests.get(processed_url)
-        response.raise_for_status()
+        response = fetch(processed_url)
+        
+        if not response.content.strip():
+            return {
+                'error': 'Downloaded CSV is empty',
+                'success': False
+            }
         
         # Read CSV
-        df = pd.read_csv(io.StringIO(response.text))
+        df = pd.read_csv(io.BytesIO(response.content))
         
         # Validate column exists
         if state_column not in df.columns:
@@ -154,6 +157,13 @@ def process_csv_from_cloud(
             'message': f"Successfully processed CSV from cloud. Found {state_count} unique states."
         }
         
+    except requests.exceptions.RequestException as e:
+        return {
+            'success': False,
+            'error': str(e),
+            'error_type': download_error_type(e),
+            'message': f"Failed to process CSV from cloud: {str(e)}"
+        }
     except Exception as e:
         return {
             'success': False,
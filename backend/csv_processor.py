@@ -1,5 +1,4 @@
 import pandas as pd
-from typing import Optional
 
 def count_states_from_csv(file_path: str, state_column: str = 'state') -> int:
     """
@@ -57,6 +56,8 @@ def get_state_list_from_csv(file_path: str, state_column: str = 'state') -> list
         
         return sorted(unique_states)  # Return sorted list
         
+    except FileNotFoundError:
+        raise FileNotFoundError(f"CSV file not found: {file_path}")
     except Exception as e:
         raise Exception(f"Error processing CSV file: {str(e)}")
 
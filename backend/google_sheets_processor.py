@@ -2,9 +2,16 @@ import pandas as pd
 import requests
 from typing import Optional, List
 import io
-from urllib.parse import urlparse
+from http_client import fetch, download_error_type
 import re
 
+# Spreadsheet ID / tab patterns, compiled once at import instead of per URL
+SHEET_ID_PATTERNS = [
+    re.compile(r'/spreadsheets/d/([a-zA-Z0-9-_]+)'),
+    re.compile(r'id=([a-zA-Z0-9-_]+)'),
+]
+GID_PATTERN = re.compile(r'gid=([0-9]+)')
+
 def convert_google_sheets_url(sheets_url: str) -> str:
     """
     Convert Google Sheets sharing URL to CSV export URL.
@@ -17,14 +24,9 @@ def convert_google_sheets_url(sheets_url: str) -> str:
     """
     try:
         # Extract spreadsheet ID from various Google Sheets URL formats
-        patterns = [
-            r'/spreadsheets/d/([a-zA-Z0-9-_]+)',
-            r'id=([a-zA-Z0-9-_]+)',
-        ]
-        
         sheet_id = None
-        for pattern in patterns:
-            match = re.search(pattern, sheets_url)
+        for pattern in SHEET_ID_PATTERNS:
+            match = pattern.search(sheets_url)
             if match:
                 sheet_id = match.group(1)
                 break
@@ -34,7 +36,7 @@ def convert_google_sheets_url(sheets_url: str) -> str:
         
         # Extract sheet name/gid if present
         gid = "0"  # Default to first sheet
-        gid_match = re.search(r'gid=([0-9]+)', sheets_url)
+        gid_match = GID_PATTERN.search(sheets_url)
         if gid_match:
             gid = gid_match.group(1)
         
@@ -61,11 +63,10 @@ def count_states_from_google_sheets(sheets_url: str, state_column: str = 'state'
         csv_url = convert_google_sheets_url(sheets_url)
         
         # Download the CSV data
-        response = requests.get(csv_url)
-        response.raise_for_status()
+        response = fetch(csv_url)
         
         # Read CSV from the response content
-        df = pd.read_csv(io.StringIO(response.text))
+        df = pd.read_csv(io.BytesIO(response.content))
         
         # Check if the state column exists
         if state_column not in df.columns:
@@ -96,11 +97,10 @@ def get_state_list_from_google_sheets(sheets_url: str, state_column: str = 'stat
         csv_url = convert_google_sheets_url(sheets_url)
         
         # Download the CSV data
-        response = requests.get(csv_url)
-        response.raise_for_status()
+        response = fetch(csv_url)
         
         # Read CSV from the response content
-        df = pd.read_csv(io.StringIO(response.text))
+        df = pd.read_csv(io.BytesIO(response.content))
         
         # Check if the state column exists
         if state_column not in df.columns:
@@ -134,11 +134,16 @@ def process_google_sheets(
         csv_url = convert_google_sheets_url(sheets_url)
         
         # Download and process the data
-        response = requests.get(csv_url)
-        response.raise_for_status()
+        response = fetch(csv_url)
+        
+        if not response.content.strip():
+            return {
+                'error': 'Google Sheet is empty',
+                'success': False
+            }
         
         # Read the data
-        df = pd.read_csv(io.StringIO(response.text))
+        df = pd.read_csv(io.BytesIO(response.content))
         
         # Validate column exists
         if state_column not in df.columns:
@@ -163,6 +168,13 @@ def process_google_sheets(
             'message': f"Successfully processed Google Sheets. Found {state_count} unique states."
         }
         
+    except requests.exceptions.RequestException as e:
+        return {
+            'success': False,
+            'error': str(e),
+            'error_type': download_error_type(e),
+            'message': f"Failed to process Google Sheets: {str(e)}"
+        }
     except Exception as e:
         return {
             'success': False,
@@ -182,10 +194,9 @@ def get_google_sheets_info(sheets_url: str) -> dict:
     """
     try:
         csv_url = convert_google_sheets_url(sheets_url)
-        response = requests.get(csv_url)
-        response.raise_for_status()
+        response = fetch(csv_url)
         
-        df = pd.read_csv(io.StringIO(response.text))
+        df = pd.read_csv(io.BytesIO(response.content))
         
         return {
             'success': True,
@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds for remote CSV downloads
+REQUEST_TIMEOUT = (5, 30)
+
+# Number of ETag-tagged responses kept for conditional re-fetches
+MAX_CACHED_RESPONSES = 32
+
+def _build_session() -> requests.Session:
+    """
+    Create a session that keeps connections alive and retries transient failures.
+    
+    Returns:
+        requests.Session: Session with retrying HTTP(S) adapters mounted
+    """
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504])
+    adapter = HTTPAdapter(max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+# Shared by all processors so repeat downloads from the same host reuse connections
+session = _build_session()
+
+# Last response per URL that carried an ETag, most recently used last
+_etag_cache = OrderedDict()
+_etag_cache_lock = threading.Lock()
+
+def fetch(url: str) -> requests.Response:
+    """
+    Download a URL over the shared session.
+    
+    Repeat downloads of a URL that previously returned an ETag are sent as
+    conditional requests; a 304 reuses the cached body instead of
+    transferring the file again.
+    
+    Args:
+        url (str): URL to download
+    
+    Returns:
+        requests.Response: Successful response
+    """
+    with _etag_cache_lock:
+        cached = _etag_cache.get(url)
+    
+    headers = {'If-None-Match': cached.headers['ETag']} if cached is not None else {}
+    response = session.get(url, timeout=REQUEST_TIMEOUT, headers=headers)
+    
+    if response.status_code == 304 and cached is not None:
+        with _etag_cache_lock:
+            if url in _etag_cache:
+                _etag_cache.move_to_end(url)
+        return cached
+    
+    response.raise_for_status()
+    
+    if response.headers.get('ETag'):
+        with _etag_cache_lock:
+            _etag_cache[url] = response
+            _etag_cache.move_to_end(url)
+            while len(_etag_cache) > MAX_CACHED_RESPONSES:
+                _etag_cache.popitem(last=False)
+    
+    return response
+
+def download_error_type(exc: requests.exceptions.RequestException) -> Optional[str]:
+    """
+    Classify a failed download for choosing the HTTP status to report.
+    
+    Args:
+        exc (RequestException): Error raised by fetch()
+    
+    Returns:
+        Optional[str]: 'timeout', 'download' for network errors and upstream
+        5xx, or None when the remote answered 4xx (a bad URL)
+    """
+    if isinstance(exc, requests.exceptions.Timeout):
+        return 'timeout'
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None \
+            and exc.response.status_code < 500:
+        return None
+    return 'download'
@@ -1,17 +1,23 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
+import os
 import pandas as pd
-import io
-from csv_processor import count_states_from_csv, get_state_list_from_csv
-from cloud_csv_processor import count_states_from_url, get_state_list_from_url, process_csv_from_cloud
-from google_sheets_processor import count_states_from_google_sheets, get_state_list_from_google_sheets, process_google_sheets, get_google_sheets_info
+from csv_processor import get_state_list_from_csv
+from cloud_csv_processor import process_csv_from_cloud
+from google_sheets_processor import process_google_sheets, get_google_sheets_info
+
+# HTTP status for processor failures caused by the download rather than the input
+DOWNLOAD_ERROR_STATUS = {'timeout': 504, 'download': 502}
 
 app = FastAPI(
     title="AI Hackathon API",
     description="Backend API for the AI Hackathon project",
-    version="0.1.0"
+    version="0.1.0",
+    # orjson serializes the state lists and sample rows much faster than stdlib json
+    default_response_class=ORJSONResponse
 )
 
 # Enable CORS
@@ -68,7 +74,7 @@ async def predict(input_data: PredictionInput):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/upload-csv", response_model=StateCountResponse)
-async def upload_csv_and_count_states(
+def upload_csv_and_count_states(
     file: UploadFile = File(...),
     state_column: str = "state"
 ):
@@ -80,9 +86,14 @@ async def upload_csv_and_count_states(
         if not file.filename.endswith('.csv'):
             raise HTTPException(status_code=400, detail="File must be a CSV")
         
-        # Read the uploaded file
-        contents = await file.read()
-        df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
+        # Reject empty uploads before handing them to the CSV parser
+        if not file.file.read(1):
+            raise HTTPException(status_code=400, detail="Uploaded CSV is empty")
+        file.file.seek(0)
+        
+        # Parse straight from the spooled upload so the file is never held
+        # in memory as both raw bytes and a decoded string
+        df = pd.read_csv(file.file, encoding='utf-8')
         
         # Check if the state column exists
         if state_column not in df.columns:
@@ -108,7 +119,7 @@ async def upload_csv_and_count_states(
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
 @app.post("/count-states-from-path")
-async def count_states_from_file_path(
+def count_states_from_file_path(
     file_path: str,
     state_column: str = "state"
 ):
@@ -116,8 +127,9 @@ async def count_states_from_file_path(
     Count states from a CSV file using file path
     """
     try:
-        state_count = count_states_from_csv(file_path, state_column)
+        # Read the CSV once; the count is just the length of the unique list
         state_list = get_state_list_from_csv(file_path, state_column)
+        state_count = len(state_list)
         
         return {
             "state_count": state_count,
@@ -133,7 +145,7 @@ async def count_states_from_file_path(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/process-cloud-csv")
-async def process_cloud_csv(request: CloudCSVRequest):
+def process_cloud_csv(request: CloudCSVRequest):
     """
     Process a CSV file from cloud storage (Google Drive, Dropbox, GitHub, etc.)
     and return comprehensive state information
@@ -159,25 +171,38 @@ async def process_cloud_csv(request: CloudCSVRequest):
         raise HTTPException(status_code=500, detail=f"Error processing cloud CSV: {str(e)}")
 
 @app.post("/count-states-from-url", response_model=StateCountResponse)
-async def count_states_from_cloud_url(request: CloudCSVRequest):
+def count_states_from_cloud_url(request: CloudCSVRequest):
     """
     Simple endpoint to count states from a cloud CSV URL
     """
     try:
-        state_count = count_states_from_url(request.url, request.state_column)
-        state_list = get_state_list_from_url(request.url, request.state_column)
+        # Download and parse the CSV once for both the count and the list
+        result = process_csv_from_cloud(
+            request.url,
+            request.state_column,
+            request.cloud_service
+        )
+        
+        if not result.get('success', False):
+            raise HTTPException(
+                status_code=DOWNLOAD_ERROR_STATUS.get(result.get('error_type'), 400),
+                detail=result.get('error', 'Unknown error processing cloud CSV')
+            )
         
+        state_count = result['state_count']
         return {
             "state_count": state_count,
-            "states": state_list,
+            "states": result['states'],
             "message": f"Successfully processed cloud CSV. Found {state_count} unique states."
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/process-google-sheets")
-async def process_google_sheets_endpoint(request: GoogleSheetsRequest):
+def process_google_sheets_endpoint(request: GoogleSheetsRequest):
     """
     Process a Google Sheets document and return comprehensive state information
     """
@@ -202,25 +227,38 @@ async def process_google_sheets_endpoint(request: GoogleSheetsRequest):
         raise HTTPException(status_code=500, detail=f"Error processing Google Sheets: {str(e)}")
 
 @app.post("/count-states-from-sheets", response_model=StateCountResponse)
-async def count_states_from_google_sheets_endpoint(request: GoogleSheetsRequest):
+def count_states_from_google_sheets_endpoint(request: GoogleSheetsRequest):
     """
     Simple endpoint to count states from a Google Sheets document
     """
     try:
-        state_count = count_states_from_google_sheets(request.sheets_url, request.state_column)
-        state_list = get_state_list_from_google_sheets(request.sheets_url, request.state_column)
+        # Download and parse the sheet once for both the count and the list
+        result = process_google_sheets(
+            request.sheets_url,
+            request.state_column,
+            request.sheet_name
+        )
+        
+        if not result.get('success', False):
+            raise HTTPException(
+                status_code=DOWNLOAD_ERROR_STATUS.get(result.get('error_type'), 400),
+                detail=result.get('error', 'Unknown error processing Google Sheets')
+            )
         
+        state_count = result['state_count']
         return {
             "state_count": state_count,
-            "states": state_list,
+            "states": result['states'],
             "message": f"Successfully processed Google Sheets. Found {state_count} unique states."
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/sheets-info")
-async def get_sheets_info(request: GoogleSheetsRequest):
+def get_sheets_info(request: GoogleSheetsRequest):
     """
     Get basic information about a Google Sheets document
     """
@@ -242,4 +280,13 @@ async def get_sheets_info(request: GoogleSheetsRequest):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Multiple workers need the app as an import string; "auto" picks
+    # uvloop/httptools when installed (uvicorn[standard], not on Windows)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        loop="auto",
+        http="auto"
+    )
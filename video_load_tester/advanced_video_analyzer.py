@@ -8,10 +8,21 @@ import cv2
 import numpy as np
 import json
 import time
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any
 import os
+from collections import Counter
 from datetime import datetime
 
+# HSV color ranges checked on every sampled frame, built once at import
+# Health bars (red/green)
+RED_LOWER = np.array([0, 50, 50], dtype=np.uint8)
+RED_UPPER = np.array([10, 255, 255], dtype=np.uint8)
+GREEN_LOWER = np.array([40, 50, 50], dtype=np.uint8)
+GREEN_UPPER = np.array([80, 255, 255], dtype=np.uint8)
+# Minimap water (blue)
+BLUE_LOWER = np.array([100, 50, 50], dtype=np.uint8)
+BLUE_UPPER = np.array([130, 255, 255], dtype=np.uint8)
+
 class GameVideoAnalyzer:
     def __init__(self):
         self.ui_templates = {}
@@ -64,19 +75,37 @@ class GameVideoAnalyzer:
         
         # Process video frames
         frame_number = 0
-        prev_frame = None
+        prev_gray = None
         scene_changes = []
+        progress_step = max(1, frame_count // 10)
         
         while True:
+            # Progress indicator
+            if frame_number and frame_number % progress_step == 0:
+                progress = (frame_number / frame_count) * 100
+                print(f"📈 Analysis progress: {progress:.1f}%")
+            
+            # Process every 5th frame for performance; grab() advances past
+            # the others without decoding them
+            if frame_number % 5 != 0:
+                if not cap.grab():
+                    break
+                frame_number += 1
+                continue
+            
             ret, frame = cap.read()
             if not ret:
                 break
             
             timestamp = frame_number / fps
             
+            # Grayscale once per frame; it feeds scene-change detection now
+            # and serves as the previous frame on the next sample
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            
             # Detect scene changes and UI transitions
-            if prev_frame is not None:
-                scene_change = self._detect_scene_change(prev_frame, frame)
+            if prev_gray is not None:
+                scene_change = self._detect_scene_change(prev_gray, gray)
                 if scene_change['changed']:
                     scene_changes.append({
                         'timestamp': timestamp,
@@ -85,7 +114,7 @@ class GameVideoAnalyzer:
                     })
             
             # Analyze current frame for UI elements and actions
-            frame_analysis = self._analyze_frame(frame, timestamp, game_type)
+            frame_analysis = self._analyze_frame(frame, gray, timestamp, game_type)
             
             if frame_analysis['ui_state']:
                 analysis_result['ui_states'].append(frame_analysis['ui_state'])
@@ -93,17 +122,8 @@ class GameVideoAnalyzer:
             if frame_analysis['user_action']:
                 analysis_result['user_actions'].append(frame_analysis['user_action'])
             
-            prev_frame = frame.copy()
+            prev_gray = gray
             frame_number += 1
-            
-            # Process every 5th frame for performance
-            if frame_number % 5 != 0:
-                continue
-            
-            # Progress indicator
-            if frame_number % (frame_count // 10) == 0:
-                progress = (frame_number / frame_count) * 100
-                print(f"📈 Analysis progress: {progress:.1f}%")
         
         cap.release()
         
@@ -117,17 +137,13 @@ class GameVideoAnalyzer:
         
         return analysis_result
     
-    def _detect_scene_change(self, prev_frame: np.ndarray, current_frame: np.ndarray) -> Dict[str, Any]:
-        """Detect significant scene changes between frames"""
-        # Convert to grayscale
-        prev_gray = cv2.cvtColor(prev_frame, cv2.COLOR_BGR2GRAY)
-        curr_gray = cv2.cvtColor(current_frame, cv2.COLOR_BGR2GRAY)
-        
+    def _detect_scene_change(self, prev_gray: np.ndarray, curr_gray: np.ndarray) -> Dict[str, Any]:
+        """Detect significant scene changes between grayscale frames"""
         # Calculate frame difference
         diff = cv2.absdiff(prev_gray, curr_gray)
         
         # Calculate change percentage
-        change_pixels = np.sum(diff > 30)  # Threshold for significant change
+        change_pixels = np.count_nonzero(diff > 30)  # Threshold for significant change
         total_pixels = diff.shape[0] * diff.shape[1]
         change_percentage = change_pixels / total_pixels
         
@@ -147,29 +163,31 @@ class GameVideoAnalyzer:
             'change_percentage': change_percentage
         }
     
-    def _analyze_frame(self, frame: np.ndarray, timestamp: float, game_type: str) -> Dict[str, Any]:
+    def _analyze_frame(self, frame: np.ndarray, gray: np.ndarray, timestamp: float, game_type: str) -> Dict[str, Any]:
         """Analyze individual frame for UI elements and user actions"""
         result = {
             'ui_state': None,
             'user_action': None
         }
         
-        # Convert to different color spaces for analysis
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        # Convert to HSV for color analysis (grayscale is passed in)
         hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
         
         # Detect UI elements
         ui_elements = self._detect_ui_elements(frame, gray, hsv)
         
+        # Classify once; both the UI state and the action detection use it
+        screen_type = self._classify_screen_type(ui_elements) if ui_elements else 'unknown'
+        
         if ui_elements:
             result['ui_state'] = {
                 'timestamp': timestamp,
                 'elements': ui_elements,
-                'screen_type': self._classify_screen_type(ui_elements)
+                'screen_type': screen_type
             }
         
         # Detect user actions based on UI changes
-        action = self._detect_user_action(frame, ui_elements, timestamp)
+        action = self._detect_user_action(screen_type, timestamp)
         if action:
             result['user_action'] = action
         
@@ -229,45 +247,39 @@ class GameVideoAnalyzer:
     
     def _has_health_bar_colors(self, hsv: np.ndarray) -> bool:
         """Detect health bar by looking for red/green color patterns"""
-        # Define color ranges for health bars (red/green)
-        red_lower = np.array([0, 50, 50])
-        red_upper = np.array([10, 255, 255])
-        green_lower = np.array([40, 50, 50])
-        green_upper = np.array([80, 255, 255])
-        
-        red_mask = cv2.inRange(hsv, red_lower, red_upper)
-        green_mask = cv2.inRange(hsv, green_lower, green_upper)
-        
-        red_pixels = np.sum(red_mask > 0)
-        green_pixels = np.sum(green_mask > 0)
-        
-        return red_pixels > 100 or green_pixels > 100
+        # inRange masks are already 0/255, so count them directly instead of
+        # building a boolean copy and summing it
+        red_mask = cv2.inRange(hsv, RED_LOWER, RED_UPPER)
+        if cv2.countNonZero(red_mask) > 100:
+            return True
+        
+        # Only build the green mask when red alone is not enough
+        green_mask = cv2.inRange(hsv, GREEN_LOWER, GREEN_UPPER)
+        return cv2.countNonZero(green_mask) > 100
     
     def _has_minimap_colors(self, hsv: np.ndarray) -> bool:
         """Detect minimap by looking for typical map colors"""
         # Look for blue (water) and brown/green (terrain) colors
-        blue_lower = np.array([100, 50, 50])
-        blue_upper = np.array([130, 255, 255])
-        
-        blue_mask = cv2.inRange(hsv, blue_lower, blue_upper)
-        blue_pixels = np.sum(blue_mask > 0)
+        blue_mask = cv2.inRange(hsv, BLUE_LOWER, BLUE_UPPER)
+        blue_pixels = cv2.countNonZero(blue_mask)
         
         return blue_pixels > 500
     
     def _classify_screen_type(self, ui_elements: List[Dict[str, Any]]) -> str:
         """Classify the type of screen based on UI elements"""
-        element_types = [elem['type'] for elem in ui_elements]
+        # One pass to tally element types; the checks below are O(1) lookups
+        element_counts = Counter(elem['type'] for elem in ui_elements)
         
-        if 'text_field' in element_types and 'button' in element_types:
+        if element_counts['text_field'] and element_counts['button']:
             return 'login_screen'
-        elif 'health_bar' in element_types and 'minimap' in element_types:
+        elif element_counts['health_bar'] and element_counts['minimap']:
             return 'gameplay_screen'
-        elif len([e for e in element_types if e == 'button']) > 3:
+        elif element_counts['button'] > 3:
             return 'menu_screen'
         else:
             return 'unknown_screen'
     
-    def _detect_user_action(self, frame: np.ndarray, ui_elements: List[Dict[str, Any]], timestamp: float) -> Dict[str, Any]:
+    def _detect_user_action(self, screen_type: str, timestamp: float) -> Dict[str, Any]:
         """Detect user actions based on UI state and changes"""
         # This is a simplified version - in production you'd track:
         # - Mouse cursor position and clicks
@@ -275,8 +287,6 @@ class GameVideoAnalyzer:
         # - UI element state changes
         # - Animation triggers
         
-        screen_type = self._classify_screen_type(ui_elements) if ui_elements else 'unknown'
-        
         # Generate actions based on screen type and timing patterns
         if screen_type == 'login_screen':
             return {
@@ -316,22 +326,29 @@ class GameVideoAnalyzer:
             return {}
         
         # Calculate timing patterns
-        action_intervals = []
-        for i in range(1, len(actions)):
-            interval = actions[i]['timestamp'] - actions[i-1]['timestamp']
-            action_intervals.append(interval)
+        action_intervals = [cur['timestamp'] - prev['timestamp'] for prev, cur in zip(actions, actions[1:])]
         
         # Analyze action sequences
         action_sequence = [action['type'] for action in actions]
         
+        # Mean interval is computed once for both the metric and the pace label;
+        # a single action has no intervals and keeps its 'slow' pace
+        avg_interval = np.mean(action_intervals) if action_intervals else 0
+        if not action_intervals or avg_interval >= 5:
+            user_pace = 'slow'
+        elif avg_interval >= 2:
+            user_pace = 'normal'
+        else:
+            user_pace = 'fast'
+        
         # Calculate user behavior metrics
         patterns = {
             'total_actions': len(actions),
-            'avg_action_interval': np.mean(action_intervals) if action_intervals else 0,
+            'avg_action_interval': avg_interval,
             'action_sequence': action_sequence,
             'session_duration': actions[-1]['timestamp'] - actions[0]['timestamp'] if len(actions) > 1 else 0,
-            'most_common_action': max(set(action_sequence), key=action_sequence.count) if action_sequence else None,
-            'user_pace': 'fast' if np.mean(action_intervals) < 2 else 'normal' if np.mean(action_intervals) < 5 else 'slow'
+            'most_common_action': Counter(action_sequence).most_common(1)[0][0] if action_sequence else None,
+            'user_pace': user_pace
         }
         
         return patterns
@@ -382,12 +399,12 @@ class GameVideoAnalyzer:
                 'confidence_avg': np.mean([a.get('confidence', 0) for a in actions]) if actions else 0
             },
             'user_behavior': {
-                'session_complexity': len(set([a['type'] for a in actions])),
+                'session_complexity': len({a['type'] for a in actions}),
                 'interaction_frequency': len(actions) / analysis_result['video_info']['duration'] if analysis_result['video_info']['duration'] > 0 else 0
             },
             'load_test_suitability': {
                 'realistic_timing': True,  # Based on action intervals
-                'api_coverage': len(set([a.get('api_endpoint') for a in actions if a.get('api_endpoint')])),
+                'api_coverage': len({a['api_endpoint'] for a in actions if a.get('api_endpoint')}),
                 'scenario_completeness': 'high' if len(actions) > 5 else 'medium' if len(actions) > 2 else 'low'
             }
         }
@@ -405,8 +422,12 @@ class GameVideoAnalyzer:
             'total_processing_time': time.time()  # You'd track this properly
         }
         
-        with open(output_path, 'w') as f:
+        # Large buffer so json.dump's many small chunks coalesce into few writes;
+        # write to a temp file and rename so readers never see a partial result
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, 'w', buffering=1 << 20) as f:
             json.dump(analysis_result, f, indent=2)
+        os.replace(tmp_path, output_path)
         
         print(f"💾 Analysis saved to: {output_path}")
 
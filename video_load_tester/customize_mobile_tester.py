@@ -5,7 +5,7 @@ Customize the load tester for your specific mobile game
 """
 
 import json
-import os
+import time
 from typing import Dict, List, Any
 
 class MobileGameCustomizer:
@@ -422,5 +422,4 @@ def interactive_customization():
     print(f"3. Run load tests with your custom scenario")
 
 if __name__ == "__main__":
-    import time
     interactive_customization()
@@ -6,11 +6,35 @@ Handles Facebook game authentication and API calls
 
 import requests
 import json
+import os
+import re
 import time
 from typing import Dict, Any, List
 import urllib.parse
 from datetime import datetime
 
+# Key/value patterns scanned over the game page, one alternation each so the
+# HTML is walked once instead of once per key name
+API_URL_MARKER = re.compile(r'api_url', re.IGNORECASE)
+BASE_URL_PATTERN = re.compile(r'(?:api_url|baseURL|apiEndpoint)["\s]*:["\s]*([^"]+)', re.IGNORECASE)
+CSRF_TOKEN_PATTERN = re.compile(r'(?:csrf_token|_token|authenticity_token)["\s]*:["\s]*([^"]+)', re.IGNORECASE)
+USER_ID_PATTERN = re.compile(r'userID["\s]*:["\s]*([^"]+)')
+ACCESS_TOKEN_PATTERN = re.compile(r'accessToken["\s]*:["\s]*([^"]+)')
+
+# Common Facebook game API patterns
+COMMON_API_PATTERNS = [
+    {'pattern': '/api/login', 'type': 'authentication', 'method': 'POST'},
+    {'pattern': '/api/user', 'type': 'user_info', 'method': 'GET'},
+    {'pattern': '/api/game/start', 'type': 'game_start', 'method': 'POST'},
+    {'pattern': '/api/game/action', 'type': 'game_action', 'method': 'POST'},
+    {'pattern': '/api/leaderboard', 'type': 'leaderboard', 'method': 'GET'},
+    {'pattern': '/api/friends', 'type': 'social', 'method': 'GET'},
+    {'pattern': '/api/achievements', 'type': 'achievements', 'method': 'GET'},
+    {'pattern': '/api/store', 'type': 'monetization', 'method': 'GET'},
+    {'pattern': '/api/purchase', 'type': 'monetization', 'method': 'POST'},
+]
+API_ENDPOINT_PATTERN = re.compile('|'.join(re.escape(p['pattern']) for p in COMMON_API_PATTERNS))
+
 class FacebookGameTester:
     def __init__(self, game_url: str, app_id: str = None):
         self.game_url = game_url
@@ -82,76 +106,45 @@ class FacebookGameTester:
         """Identify common API endpoints used by Facebook games"""
         endpoints = []
         
-        # Common Facebook game API patterns
-        common_patterns = [
-            {'pattern': '/api/login', 'type': 'authentication', 'method': 'POST'},
-            {'pattern': '/api/user', 'type': 'user_info', 'method': 'GET'},
-            {'pattern': '/api/game/start', 'type': 'game_start', 'method': 'POST'},
-            {'pattern': '/api/game/action', 'type': 'game_action', 'method': 'POST'},
-            {'pattern': '/api/leaderboard', 'type': 'leaderboard', 'method': 'GET'},
-            {'pattern': '/api/friends', 'type': 'social', 'method': 'GET'},
-            {'pattern': '/api/achievements', 'type': 'achievements', 'method': 'GET'},
-            {'pattern': '/api/store', 'type': 'monetization', 'method': 'GET'},
-            {'pattern': '/api/purchase', 'type': 'monetization', 'method': 'POST'},
-        ]
-        
-        # Look for actual API calls in the HTML/JavaScript
-        for pattern_info in common_patterns:
-            if pattern_info['pattern'] in html_content:
-                endpoints.append({
-                    'endpoint': pattern_info['pattern'],
-                    'type': pattern_info['type'],
-                    'method': pattern_info['method'],
-                    'detected': True
-                })
-            else:
-                # Add as potential endpoint even if not detected
-                endpoints.append({
-                    'endpoint': pattern_info['pattern'],
-                    'type': pattern_info['type'],
-                    'method': pattern_info['method'],
-                    'detected': False
-                })
+        # Look for actual API calls in the HTML/JavaScript with one scan,
+        # stopping as soon as every known endpoint has been seen
+        detected = set()
+        for match in API_ENDPOINT_PATTERN.finditer(html_content):
+            detected.add(match.group(0))
+            if len(detected) == len(COMMON_API_PATTERNS):
+                break
+        
+        # Patterns not detected are still added as potential endpoints
+        for pattern_info in COMMON_API_PATTERNS:
+            endpoints.append({
+                'endpoint': pattern_info['pattern'],
+                'type': pattern_info['type'],
+                'method': pattern_info['method'],
+                'detected': pattern_info['pattern'] in detected
+            })
         
         return endpoints
     
     def _extract_base_url(self, html_content: str) -> str:
         """Extract the base API URL"""
         # Try to find API base URL in the content
-        if 'api_url' in html_content.lower():
+        # Case-insensitive marker check without lowercasing a copy of the page
+        if API_URL_MARKER.search(html_content):
             # Look for common patterns
-            patterns = [
-                r'api_url["\s]*:["\s]*([^"]+)',
-                r'baseURL["\s]*:["\s]*([^"]+)',
-                r'apiEndpoint["\s]*:["\s]*([^"]+)'
-            ]
-            
-            import re
-            for pattern in patterns:
-                match = re.search(pattern, html_content, re.IGNORECASE)
-                if match:
-                    return match.group(1)
+            match = BASE_URL_PATTERN.search(html_content)
+            if match:
+                return match.group(1)
         
         # Default to same domain
-        from urllib.parse import urlparse
-        parsed = urlparse(self.game_url)
+        parsed = urllib.parse.urlparse(self.game_url)
         return f"{parsed.scheme}://{parsed.netloc}"
     
     def _extract_csrf_token(self, html_content: str) -> str:
         """Extract CSRF token if present"""
-        import re
-        
         # Common CSRF token patterns
-        patterns = [
-            r'csrf_token["\s]*:["\s]*([^"]+)',
-            r'_token["\s]*:["\s]*([^"]+)',
-            r'authenticity_token["\s]*:["\s]*([^"]+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, html_content, re.IGNORECASE)
-            if match:
-                return match.group(1)
+        match = CSRF_TOKEN_PATTERN.search(html_content)
+        if match:
+            return match.group(1)
         
         return None
     
@@ -161,15 +154,13 @@ class FacebookGameTester:
         
         # Look for Facebook user ID
         if 'userID' in html_content:
-            import re
-            match = re.search(r'userID["\s]*:["\s]*([^"]+)', html_content)
+            match = USER_ID_PATTERN.search(html_content)
             if match:
                 session_info['user_id'] = match.group(1)
         
         # Look for access token
         if 'accessToken' in html_content:
-            import re
-            match = re.search(r'accessToken["\s]*:["\s]*([^"]+)', html_content)
+            match = ACCESS_TOKEN_PATTERN.search(html_content)
             if match:
                 session_info['access_token'] = match.group(1)
         
@@ -196,8 +187,7 @@ class FacebookGameTester:
     
     def _extract_base_url_from_game_url(self) -> str:
         """Extract base URL from game URL"""
-        from urllib.parse import urlparse
-        parsed = urlparse(self.game_url)
+        parsed = urllib.parse.urlparse(self.game_url)
         return f"{parsed.scheme}://{parsed.netloc}"
     
     def create_load_test_scenario(self, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
@@ -374,7 +364,6 @@ def main():
         scenario = create_facebook_game_scenario(game_url, app_id)
         
         # Save scenario
-        import os
         os.makedirs('facebook_scenarios', exist_ok=True)
         
         scenario_file = f"facebook_scenarios/scenario_{int(time.time())}.json"
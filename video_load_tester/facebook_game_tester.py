@@ -4,37 +4,57 @@ Facebook Game Load Tester - Web Interface
 Easy way to test Facebook games and websites
 """
 
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, request, jsonify
 import requests
-import json
+from requests.adapters import HTTPAdapter
 import time
 import threading
+import itertools
+from collections import deque
 from datetime import datetime
 from typing import Dict, Any, List
-import os
 import urllib.parse
+from flask_compress import Compress
+from json_provider import ORJSONProvider
+from response_cache import TTLResponseCache, is_finished_test
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+# Compress the dashboard page and polled JSON (Brotli, gzip fallback)
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 512
+Compress(app)
+
+# Keep-alive connections held per host for website analysis requests
+ANALYSIS_POOL_SIZE = 10
 
 class FacebookGameLoadTester:
     def __init__(self):
         self.active_tests = {}
+        # Sequence suffix keeps test ids unique when tests start in the same second
+        self.test_ids = itertools.count(1)
         self.scenarios = {}
+        
+        # Shared across /analyze requests so repeat analyses of the same host
+        # reuse pooled keep-alive connections instead of a new handshake each time
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=ANALYSIS_POOL_SIZE, pool_maxsize=ANALYSIS_POOL_SIZE)
+        self.http.mount('http://', adapter)
+        self.http.mount('https://', adapter)
+        self.http.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+        })
     
     def analyze_website(self, url: str) -> Dict[str, Any]:
         """Analyze any website/game to create load test scenarios"""
         print(f"🔍 Analyzing website: {url}")
         
         try:
-            session = requests.Session()
-            session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            })
-            
-            response = session.get(url, timeout=10)
-            
-            if response.status_code != 200:
-                raise Exception(f"Cannot access URL: {response.status_code}")
+            # Scenarios are built from the URL alone, so only the status line is
+            # needed; stream=True lets the body be dropped without downloading it
+            with self.http.get(url, timeout=10, stream=True) as response:
+                if response.status_code != 200:
+                    raise Exception(f"Cannot access URL: {response.status_code}")
             
             # Extract basic info
             parsed_url = urllib.parse.urlparse(url)
@@ -45,9 +65,9 @@ class FacebookGameLoadTester:
             
             # Create scenarios based on site type
             if is_facebook_game:
-                scenarios = self._create_facebook_scenarios(base_url, response.text)
+                scenarios = self._create_facebook_scenarios(base_url)
             else:
-                scenarios = self._create_generic_scenarios(base_url, response.text)
+                scenarios = self._create_generic_scenarios(base_url)
             
             return {
                 'url': url,
@@ -61,7 +81,7 @@ class FacebookGameLoadTester:
             print(f"❌ Error analyzing website: {e}")
             return self._create_fallback_scenarios(url)
     
-    def _create_facebook_scenarios(self, base_url: str, html_content: str) -> List[Dict[str, Any]]:
+    def _create_facebook_scenarios(self, base_url: str) -> List[Dict[str, Any]]:
         """Create Facebook game specific scenarios"""
         scenarios = []
         
@@ -165,7 +185,7 @@ class FacebookGameLoadTester:
         
         return scenarios
     
-    def _create_generic_scenarios(self, base_url: str, html_content: str) -> List[Dict[str, Any]]:
+    def _create_generic_scenarios(self, base_url: str) -> List[Dict[str, Any]]:
         """Create generic website scenarios"""
         scenarios = []
         
@@ -269,7 +289,7 @@ class FacebookGameLoadTester:
     
     def run_load_test(self, config: Dict[str, Any]) -> str:
         """Run load test with the specified configuration"""
-        test_id = f"test_{int(time.time())}"
+        test_id = f"test_{int(time.time())}_{next(self.test_ids)}"
         
         test_session = {
             'id': test_id,
@@ -297,6 +317,7 @@ class FacebookGameLoadTester:
     
     def _execute_load_test(self, test_id: str, config: Dict[str, Any]):
         """Execute the actual load test"""
+        user_threads = []
         try:
             base_url = config['base_url']
             scenario = config['scenario']
@@ -305,8 +326,6 @@ class FacebookGameLoadTester:
             ramp_up_time = config.get('ramp_up_time', 60)
             
             # Create user threads
-            user_threads = []
-            
             for user_id in range(concurrent_users):
                 start_delay = (ramp_up_time / concurrent_users) * user_id
                 
@@ -329,12 +348,18 @@ class FacebookGameLoadTester:
                 thread.join(timeout=30)
             
             # Finalize
-            self.active_tests[test_id]['status'] = 'completed'
             self.active_tests[test_id]['end_time'] = datetime.now().isoformat()
+            self.active_tests[test_id]['status'] = 'completed'
             
         except Exception as e:
-            self.active_tests[test_id]['status'] = 'failed'
             self.active_tests[test_id]['error'] = str(e)
+            self.active_tests[test_id]['status'] = 'failed'
+        finally:
+            # Workers can outlive a timed join or a failure; the test's JSON
+            # is only cached once every one of them has exited
+            for thread in user_threads:
+                thread.join()
+            self.active_tests[test_id]['finalized'] = True
     
     def _simulate_user(self, test_id: str, user_id: int, base_url: str, scenario: Dict, start_delay: float, duration: float):
         """Simulate a single user session"""
@@ -422,30 +447,45 @@ class FacebookGameLoadTester:
         if not results:
             return
         
-        total_requests = len(results)
-        successful_requests = sum(1 for r in results if r['success'])
-        failed_requests = total_requests - successful_requests
-        
-        response_times = [r['response_time'] for r in results if r['response_time'] > 0]
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
+        # Single pass with running totals instead of intermediate lists
+        total_requests = 0
+        successful_requests = 0
+        response_time_total = 0.0
+        response_time_count = 0
+        # Only the last 10 errors are reported, so keep no more than that
+        errors = deque(maxlen=10)
+        for r in results:
+            total_requests += 1
+            if r['success']:
+                successful_requests += 1
+            else:
+                errors.append(r.get('error', 'Unknown error'))
+            if r['response_time'] > 0:
+                response_time_total += r['response_time']
+                response_time_count += 1
         
-        errors = [r.get('error', 'Unknown error') for r in results if not r['success']]
+        failed_requests = total_requests - successful_requests
+        avg_response_time = response_time_total / response_time_count if response_time_count else 0
         
         test_session['metrics'].update({
             'total_requests': total_requests,
             'successful_requests': successful_requests,
             'failed_requests': failed_requests,
             'avg_response_time': avg_response_time,
-            'errors': errors[-10:]  # Keep last 10 errors
+            'errors': list(errors)  # Keep last 10 errors
         })
 
 # Initialize the tester
 facebook_tester = FacebookGameLoadTester()
 
+# Dashboards poll the test list; share one serialized snapshot per second
+active_tests_cache = TTLResponseCache()
+
 @app.route('/')
 def dashboard():
     """Facebook Game Testing Dashboard"""
-    return render_template_string('''
+    # Static page with no template variables; returned as-is so Flask skips Jinja
+    return '''
 <!DOCTYPE html>
 <html>
 <head>
@@ -708,13 +748,15 @@ def dashboard():
     </script>
 </body>
 </html>
-    ''')
+    '''
 
 @app.route('/analyze', methods=['POST'])
 def analyze_website():
     """Analyze website/game"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'error': 'JSON object body required'}), 400
         url = data.get('url')
         
         if not url:
@@ -730,8 +772,11 @@ def analyze_website():
 def start_test():
     """Start load test"""
     try:
-        config = request.get_json()
+        config = request.get_json(silent=True)
+        if not isinstance(config, dict):
+            return jsonify({'success': False, 'error': 'JSON object body required'}), 400
         test_id = facebook_tester.run_load_test(config)
+        active_tests_cache.invalidate()
         
         return jsonify({'success': True, 'test_id': test_id})
         
@@ -741,7 +786,7 @@ def start_test():
 @app.route('/active_tests')
 def get_active_tests():
     """Get active tests"""
-    return jsonify(facebook_tester.active_tests)
+    return active_tests_cache.json_response(lambda: facebook_tester.active_tests, is_finished_test)
 
 if __name__ == '__main__':
     print("🎮 Starting Facebook Game Load Tester...")
@@ -5,14 +5,24 @@ Help find and analyze mobile game API endpoints
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
-import re
-from urllib.parse import urlparse, urljoin
-from typing import Dict, List, Any
-import time
+from urllib.parse import urljoin
+from typing import Dict, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Max endpoints probed concurrently against one base URL
+MAX_PROBE_WORKERS = 6
 
 class MobileAPIDiscovery:
     def __init__(self):
+        # Shared session so probes reuse keep-alive connections; pool sized
+        # to the number of concurrent probe workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=MAX_PROBE_WORKERS, pool_maxsize=MAX_PROBE_WORKERS)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
         self.common_patterns = [
             # Common mobile game API patterns
             "api.{domain}",
@@ -65,53 +75,60 @@ class MobileAPIDiscovery:
         
         print(f"🔍 Testing API endpoints for: {base_url}")
         
-        for endpoint in self.common_endpoints:
-            try:
-                url = urljoin(base_url, endpoint)
-                
-                # Test GET request
-                response = requests.get(url, timeout=5, headers={
-                    'User-Agent': 'MobileGameTester/1.0',
-                    'Accept': 'application/json'
+        # Probe endpoints concurrently; results are reported in endpoint order
+        with ThreadPoolExecutor(max_workers=MAX_PROBE_WORKERS) as executor:
+            probes = list(executor.map(
+                lambda endpoint: self._probe_endpoint(base_url, endpoint),
+                self.common_endpoints
+            ))
+        
+        for endpoint, response, error in probes:
+            if error is not None:
+                results['errors'].append({
+                    'endpoint': endpoint,
+                    'error': str(error)
                 })
+                print(f"  💥 {endpoint} - Error: {error}")
+                continue
+            
+            if response.status_code == 200:
+                results['accessible_endpoints'].append({
+                    'endpoint': endpoint,
+                    'method': 'GET',
+                    'status': response.status_code,
+                    'content_type': response.headers.get('content-type', ''),
+                    'response_size': len(response.content)
+                })
+                print(f"  ✅ {endpoint} - {response.status_code}")
                 
-                if response.status_code == 200:
-                    results['accessible_endpoints'].append({
-                        'endpoint': endpoint,
-                        'method': 'GET',
-                        'status': response.status_code,
-                        'content_type': response.headers.get('content-type', ''),
-                        'response_size': len(response.content)
-                    })
-                    print(f"  ✅ {endpoint} - {response.status_code}")
-                    
-                elif response.status_code in [401, 403]:
-                    results['requires_auth'].append({
-                        'endpoint': endpoint,
-                        'status': response.status_code,
-                        'auth_required': True
-                    })
-                    print(f"  🔐 {endpoint} - {response.status_code} (Auth Required)")
-                    
-                elif response.status_code == 404:
-                    results['not_found'].append(endpoint)
-                    print(f"  ❌ {endpoint} - 404")
-                    
-                else:
-                    print(f"  ⚠️  {endpoint} - {response.status_code}")
-                
-                # Small delay to be respectful
-                time.sleep(0.1)
-                
-            except Exception as e:
-                results['errors'].append({
+            elif response.status_code in [401, 403]:
+                results['requires_auth'].append({
                     'endpoint': endpoint,
-                    'error': str(e)
+                    'status': response.status_code,
+                    'auth_required': True
                 })
-                print(f"  💥 {endpoint} - Error: {e}")
+                print(f"  🔐 {endpoint} - {response.status_code} (Auth Required)")
+                
+            elif response.status_code == 404:
+                results['not_found'].append(endpoint)
+                print(f"  ❌ {endpoint} - 404")
+                
+            else:
+                print(f"  ⚠️  {endpoint} - {response.status_code}")
         
         return results
     
+    def _probe_endpoint(self, base_url: str, endpoint: str) -> Tuple[str, Optional[requests.Response], Optional[Exception]]:
+        """Send a GET to a single endpoint, returning the response or the error"""
+        try:
+            response = self.session.get(urljoin(base_url, endpoint), timeout=5, headers={
+                'User-Agent': 'MobileGameTester/1.0',
+                'Accept': 'application/json'
+            })
+            return endpoint, response, None
+        except Exception as e:
+            return endpoint, None, e
+    
     def analyze_mobile_game(self, game_name: str) -> Dict[str, Any]:
         """Complete analysis of a mobile game's API"""
         print(f"🎮 Analyzing mobile game: {game_name}")
@@ -126,24 +143,26 @@ class MobileAPIDiscovery:
             'recommendations': []
         }
         
+        # First, check which base URLs are accessible; most guessed hosts do
+        # not resolve, so probe them concurrently instead of timing out serially
+        with ThreadPoolExecutor(max_workers=MAX_PROBE_WORKERS) as executor:
+            base_probes = list(executor.map(lambda url: self._probe_endpoint(url, ''), possible_urls))
+        
         # Test each possible URL
-        for url in possible_urls:
-            try:
-                print(f"\n🔗 Testing: {url}")
-                
-                # First, check if the base URL is accessible
-                response = requests.get(url, timeout=5)
-                
-                if response.status_code < 500:  # Server exists
-                    endpoint_results = self.test_api_endpoints(url)
-                    
-                    if (endpoint_results['accessible_endpoints'] or 
-                        endpoint_results['requires_auth']):
-                        analysis_results['working_apis'].append(endpoint_results)
-                        print(f"  🎯 Found working API at: {url}")
+        for url, (_, response, error) in zip(possible_urls, base_probes):
+            print(f"\n🔗 Testing: {url}")
+            
+            if error is not None:
+                print(f"  ❌ {url} not accessible: {error}")
+                continue
+            
+            if response.status_code < 500:  # Server exists
+                endpoint_results = self.test_api_endpoints(url)
                 
-            except Exception as e:
-                print(f"  ❌ {url} not accessible: {e}")
+                if (endpoint_results['accessible_endpoints'] or 
+                    endpoint_results['requires_auth']):
+                    analysis_results['working_apis'].append(endpoint_results)
+                    print(f"  🎯 Found working API at: {url}")
         
         # Generate recommendations
         analysis_results['recommendations'] = self._generate_recommendations(analysis_results)
@@ -9,8 +9,15 @@ import time
 import random
 import threading
 from datetime import datetime
+import orjson
+from json_provider import ORJSONProvider
+from waitress import serve
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+
+# Worker threads for the WSGI server; the load tester drives many concurrent users
+SERVER_THREADS = 32
 
 # Simulate game state
 game_state = {
@@ -23,18 +30,26 @@ game_state = {
 # User sessions
 user_sessions = {}
 
+API_ENDPOINTS = [
+    'POST /api/login - User login',
+    'GET /api/lobby - Get lobby info',
+    'POST /api/join_game - Join game session',
+    'GET /api/game_status - Get game status',
+    'POST /api/logout - User logout',
+    'GET /api/server_stats - Server statistics'
+]
+
+# Logout always answers the same way, so encode the body once
+LOGOUT_RESPONSE = orjson.dumps({
+    'success': True,
+    'message': 'Logged out successfully'
+})
+
 @app.route('/')
 def home():
     return jsonify({
         'message': 'Game API Simulator - Ready for Load Testing! 🎮',
-        'endpoints': [
-            'POST /api/login - User login',
-            'GET /api/lobby - Get lobby info',
-            'POST /api/join_game - Join game session',
-            'GET /api/game_status - Get game status',
-            'POST /api/logout - User logout',
-            'GET /api/server_stats - Server statistics'
-        ],
+        'endpoints': API_ENDPOINTS,
         'current_stats': game_state
     })
 
@@ -42,7 +57,7 @@ def home():
 def login():
     """Simulate user login"""
     try:
-        data = request.get_json() or {}
+        data = request.get_json(silent=True) or {}
         username = data.get('username', f'user_{random.randint(1000, 9999)}')
         password = data.get('password', 'password')
         
@@ -124,7 +139,7 @@ def lobby():
 def join_game():
     """Simulate joining a game"""
     try:
-        data = request.get_json() or {}
+        data = request.get_json(silent=True) or {}
         game_id = data.get('game_id', 'game_1')
         
         # Simulate matchmaking time
@@ -187,20 +202,16 @@ def game_status():
 def logout():
     """Simulate user logout"""
     try:
-        data = request.get_json() or {}
+        data = request.get_json(silent=True) or {}
         session_id = data.get('session_id')
         
-        if session_id in user_sessions:
-            del user_sessions[session_id]
+        user_sessions.pop(session_id, None)
         
         # Update game state
         game_state['active_users'] = max(0, game_state['active_users'] - 1)
         game_state['server_load'] = max(0.0, game_state['active_users'] / 1000)
         
-        return jsonify({
-            'success': True,
-            'message': 'Logged out successfully'
-        })
+        return app.response_class(LOGOUT_RESPONSE, mimetype='application/json')
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -254,4 +265,6 @@ if __name__ == '__main__':
     bg_thread.daemon = True
     bg_thread.start()
     
-    app.run(host='0.0.0.0', port=3000, debug=True)
+    # Serve with waitress rather than the debug server so concurrent virtual
+    # users are handled in parallel and the reloader doesn't fork a second copy
+    serve(app, host='0.0.0.0', port=3000, threads=SERVER_THREADS)
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+orjson JSON Provider
+Shared Flask JSON provider so jsonify() responses are encoded by orjson
+"""
+
+import orjson
+from flask.json.provider import JSONProvider, DefaultJSONProvider
+
+# Tester metrics hold numpy scalars and some int-keyed dicts
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+class ORJSONProvider(JSONProvider):
+    """Encode and decode JSON with orjson, falling back to Flask's encoder"""
+    
+    def __init__(self, app):
+        super().__init__(app)
+        self.fallback = DefaultJSONProvider(app)
+    
+    def dumps(self, obj, **kwargs) -> str:
+        try:
+            return orjson.dumps(obj, option=ORJSON_OPTIONS).decode()
+        except TypeError:
+            # Types orjson does not handle go through the stdlib encoder
+            return self.fallback.dumps(obj, **kwargs)
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
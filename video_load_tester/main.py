@@ -4,37 +4,79 @@ Video-Based Load Testing System
 Automates load testing using video scenarios for realistic user behavior simulation
 """
 
-from flask import Flask, request, jsonify, render_template_string
-from flask_socketio import SocketIO, emit
+from flask import Flask, request, jsonify
+from flask_socketio import SocketIO
 import cv2
-import numpy as np
 import threading
+import itertools
 import time
 import json
 import requests
-import subprocess
 import os
+import hashlib
+import copy
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Any
 import queue
 import logging
+from flask_compress import Compress
+from json_provider import ORJSONProvider
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+# Compress the dashboard page and polled JSON (Brotli, gzip fallback)
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 512
+Compress(app)
 app.config['SECRET_KEY'] = 'video_load_tester_secret'
 socketio = SocketIO(app, cors_allowed_origins="*")
 
+# Buffer size for writing JSON test reports
+REPORT_WRITE_BUFFER = 1 << 20
+
+# Chunk size for hashing uploaded videos
+VIDEO_HASH_CHUNK = 1 << 20
+
+# Distinct video analyses kept for re-uploads, least recently used evicted first
+MAX_CACHED_ANALYSES = 16
+
+# Uploaded videos analyzed at once, off the request threads
+ANALYSIS_WORKERS = 2
+
 # Global state
 test_sessions = {}
 video_scenarios = {}
+# Upload analysis state by scenario name: 'analyzing', 'ready' or 'failed'
+scenario_status = {}
 active_tests = {}
 
 class VideoScenarioProcessor:
     def __init__(self):
         self.scenarios = {}
+        # Video analysis results keyed by content hash, so re-uploads of the
+        # same recording skip frame decoding; shared by the analysis workers
+        self.analysis_cache = OrderedDict()
+        self.analysis_cache_lock = threading.Lock()
         
     def analyze_video_scenario(self, video_path: str, scenario_name: str) -> Dict[str, Any]:
         """Analyze video to extract user actions and timing"""
         try:
+            digest = self._file_digest(video_path)
+            with self.analysis_cache_lock:
+                cached = self.analysis_cache.get(digest)
+                if cached:
+                    self.analysis_cache.move_to_end(digest)
+                    # Deep copy so edits to one scenario never reach the cache
+                    scenario = copy.deepcopy(cached)
+            if cached:
+                scenario.update(name=scenario_name,
+                                video_path=video_path,
+                                created_at=datetime.now().isoformat())
+                self.scenarios[scenario_name] = scenario
+                return scenario
+            
             cap = cv2.VideoCapture(video_path)
             
             if not cap.isOpened():
@@ -49,6 +91,14 @@ class VideoScenarioProcessor:
             frame_number = 0
             
             while True:
+                # Process every 30th frame for performance; grab() advances
+                # past the others without decoding them
+                if frame_number % 30 != 0:
+                    if not cap.grab():
+                        break
+                    frame_number += 1
+                    continue
+                
                 ret, frame = cap.read()
                 if not ret:
                     break
@@ -61,10 +111,6 @@ class VideoScenarioProcessor:
                     actions.append(action)
                 
                 frame_number += 1
-                
-                # Process every 30th frame for performance
-                if frame_number % 30 != 0:
-                    continue
             
             cap.release()
             
@@ -79,11 +125,24 @@ class VideoScenarioProcessor:
             }
             
             self.scenarios[scenario_name] = scenario
+            with self.analysis_cache_lock:
+                self.analysis_cache[digest] = copy.deepcopy(scenario)
+                self.analysis_cache.move_to_end(digest)
+                while len(self.analysis_cache) > MAX_CACHED_ANALYSES:
+                    self.analysis_cache.popitem(last=False)
             return scenario
             
         except Exception as e:
             raise Exception(f"Video analysis failed: {str(e)}")
     
+    def _file_digest(self, path: str) -> str:
+        """Hash file contents in chunks without loading the whole video"""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(VIDEO_HASH_CHUNK), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
     def _detect_action_in_frame(self, frame, timestamp) -> Dict[str, Any]:
         """Detect user actions in video frame"""
         # This is a simplified version - in production you'd use:
@@ -133,11 +192,16 @@ class VideoScenarioProcessor:
 class LoadTestExecutor:
     def __init__(self):
         self.active_tests = {}
-        self.results_queue = queue.Queue()
+        # Sequence suffix keeps test ids unique when tests start in the same second
+        self.test_ids = itertools.count(1)
+        # User threads only enqueue finished sessions; each test's monitor
+        # loop drains its queue in batches and keeps running totals
+        self.result_queues = {}
+        self.metric_totals = {}
         
     def execute_load_test(self, test_config: Dict[str, Any]) -> str:
         """Execute load test based on video scenario"""
-        test_id = f"test_{int(time.time())}"
+        test_id = f"test_{int(time.time())}_{next(self.test_ids)}"
         
         test_session = {
             'id': test_id,
@@ -155,6 +219,21 @@ class LoadTestExecutor:
         }
         
         self.active_tests[test_id] = test_session
+        self.result_queues[test_id] = queue.SimpleQueue()
+        self.metric_totals[test_id] = {
+            'successful_sessions': 0,
+            'response_time_total': 0.0,
+            'response_time_count': 0,
+            # Only the last 10 errors are reported, so keep no more than that
+            'errors': deque(maxlen=10)
+        }
+        
+        # Push the new test to dashboards instead of waiting for them to poll
+        socketio.emit('test_started', {
+            'id': test_id,
+            'status': test_session['status'],
+            'config': test_config
+        })
         
         # Start test in background thread
         thread = threading.Thread(
@@ -168,6 +247,7 @@ class LoadTestExecutor:
     
     def _run_test_scenario(self, test_id: str, config: Dict[str, Any]):
         """Run the actual load test scenario"""
+        user_threads = []
         try:
             scenario_name = config['scenario']
             concurrent_users = config.get('concurrent_users', 10)
@@ -179,16 +259,21 @@ class LoadTestExecutor:
             if not scenario:
                 raise Exception(f"Scenario '{scenario_name}' not found")
             
-            # Create user simulation threads
-            user_threads = []
+            # Precompute the video-timed waits once instead of per user/action
+            actions = scenario['actions']
+            wait_times = [0.0] + [
+                max(0, actions[i]['timestamp'] - actions[i - 1]['timestamp'])
+                for i in range(1, len(actions))
+            ]
             
+            # Create user simulation threads
             for user_id in range(concurrent_users):
                 # Stagger user start times for realistic ramp-up
                 start_delay = (ramp_up_time / concurrent_users) * user_id
                 
                 thread = threading.Thread(
                     target=self._simulate_user_session,
-                    args=(test_id, user_id, scenario, config, start_delay)
+                    args=(test_id, user_id, scenario, config, start_delay, wait_times)
                 )
                 thread.daemon = True
                 user_threads.append(thread)
@@ -215,11 +300,27 @@ class LoadTestExecutor:
             self.active_tests[test_id]['status'] = 'failed'
             self.active_tests[test_id]['error'] = str(e)
             logging.error(f"Test {test_id} failed: {e}")
+            socketio.emit('test_failed', {
+                'test_id': test_id,
+                'error': str(e)
+            })
+        finally:
+            # Workers can outlive the timed join; wait for them, fold in their
+            # sessions, then drop the per-test queue and totals
+            for thread in user_threads:
+                thread.join()
+            self._update_test_metrics(test_id)
+            self.result_queues.pop(test_id, None)
+            self.metric_totals.pop(test_id, None)
     
-    def _simulate_user_session(self, test_id: str, user_id: int, scenario: Dict, config: Dict, start_delay: float):
+    def _simulate_user_session(self, test_id: str, user_id: int, scenario: Dict, config: Dict, start_delay: float, wait_times: List[float]):
         """Simulate a single user session based on video scenario"""
         time.sleep(start_delay)
         
+        # One session per simulated user so its actions reuse a keep-alive
+        # connection, like a real client would
+        session = requests.Session()
+        
         session_start = time.time()
         session_result = {
             'user_id': user_id,
@@ -234,18 +335,16 @@ class LoadTestExecutor:
             base_url = config.get('target_url', 'http://localhost:3000')
             
             # Execute actions from video scenario
-            for action in scenario['actions']:
-                action_result = self._execute_action(action, base_url, user_id)
+            for action, wait_time in zip(scenario['actions'], wait_times):
+                action_result = self._execute_action(session, action, base_url, user_id)
                 session_result['actions'].append(action_result)
                 
                 if not action_result['success']:
                     session_result['errors'].append(action_result['error'])
                 
                 # Wait based on video timing
-                if len(session_result['actions']) > 1:
-                    prev_action = scenario['actions'][len(session_result['actions']) - 2]
-                    wait_time = action['timestamp'] - prev_action['timestamp']
-                    time.sleep(max(0, wait_time))
+                if wait_time:
+                    time.sleep(wait_time)
             
             session_result['success'] = len(session_result['errors']) == 0
             session_result['total_time'] = time.time() - session_start
@@ -255,18 +354,19 @@ class LoadTestExecutor:
             session_result['success'] = False
             session_result['total_time'] = time.time() - session_start
         
+        session.close()
+        
         # Store results
-        self.active_tests[test_id]['results'].append(session_result)
-        self.results_queue.put((test_id, session_result))
+        self.result_queues[test_id].put(session_result)
     
-    def _execute_action(self, action: Dict, base_url: str, user_id: int) -> Dict[str, Any]:
+    def _execute_action(self, session: requests.Session, action: Dict, base_url: str, user_id: int) -> Dict[str, Any]:
         """Execute a specific action from the video scenario"""
         action_start = time.time()
         
         try:
             if action['type'] == 'login_screen':
                 # Simulate login API call
-                response = requests.post(f"{base_url}/api/login", json={
+                response = session.post(f"{base_url}/api/login", json={
                     'username': f'test_user_{user_id}',
                     'password': 'test_password'
                 }, timeout=10)
@@ -281,7 +381,7 @@ class LoadTestExecutor:
             
             elif action['type'] == 'lobby_screen':
                 # Simulate lobby/matchmaking API call
-                response = requests.get(f"{base_url}/api/lobby", timeout=10)
+                response = session.get(f"{base_url}/api/lobby", timeout=10)
                 
                 return {
                     'type': action['type'],
@@ -314,31 +414,44 @@ class LoadTestExecutor:
         """Update test metrics in real-time"""
         test_session = self.active_tests[test_id]
         results = test_session['results']
-        
-        if not results:
+        result_queue = self.result_queues[test_id]
+        totals = self.metric_totals[test_id]
+        
+        # Fold in only the sessions finished since the last update
+        new_results = 0
+        while not result_queue.empty():
+            r = result_queue.get_nowait()
+            results.append(r)
+            new_results += 1
+            if r['success']:
+                totals['successful_sessions'] += 1
+            if r['total_time'] > 0:
+                totals['response_time_total'] += r['total_time']
+                totals['response_time_count'] += 1
+            totals['errors'].extend(r['errors'])
+        
+        if not new_results:
             return
         
         total_users = len(results)
-        successful_sessions = sum(1 for r in results if r['success'])
+        successful_sessions = totals['successful_sessions']
         failed_sessions = total_users - successful_sessions
-        
-        response_times = [r['total_time'] for r in results if r['total_time'] > 0]
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
-        
-        all_errors = []
-        for r in results:
-            all_errors.extend(r['errors'])
+        response_time_count = totals['response_time_count']
+        avg_response_time = totals['response_time_total'] / response_time_count if response_time_count else 0
         
         test_session['metrics'].update({
             'total_users': total_users,
             'successful_sessions': successful_sessions,
             'failed_sessions': failed_sessions,
             'avg_response_time': avg_response_time,
-            'errors': all_errors[-10:]  # Keep last 10 errors
+            'errors': list(totals['errors'])  # Keep last 10 errors
         })
     
     def _finalize_test(self, test_id: str):
         """Finalize test and generate report"""
+        # Pick up sessions that finished after the last monitor tick
+        self._update_test_metrics(test_id)
+        
         test_session = self.active_tests[test_id]
         test_session['status'] = 'completed'
         test_session['end_time'] = datetime.now().isoformat()
@@ -364,19 +477,44 @@ class LoadTestExecutor:
             'generated_at': datetime.now().isoformat()
         }
         
-        # Save report to file
+        # Save report to file (large buffer so json.dump's many small
+        # chunks for the full timeline coalesce into a few writes).
+        # Write to a temp file and rename so readers never see a partial report.
         os.makedirs('reports', exist_ok=True)
-        with open(f'reports/test_report_{test_id}.json', 'w') as f:
+        report_path = f'reports/test_report_{test_id}.json'
+        tmp_path = f'{report_path}.tmp'
+        with open(tmp_path, 'w', buffering=REPORT_WRITE_BUFFER) as f:
             json.dump(report, f, indent=2)
+        os.replace(tmp_path, report_path)
 
 # Initialize components
 video_processor = VideoScenarioProcessor()
 load_executor = LoadTestExecutor()
+analysis_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS)
+
+def _analyze_scenario_in_background(video_path: str, scenario_name: str):
+    """Analyze an uploaded video and notify dashboards when done"""
+    try:
+        scenario = video_processor.analyze_video_scenario(video_path, scenario_name)
+        video_scenarios[scenario_name] = scenario
+        scenario_status[scenario_name] = {'status': 'ready'}
+        socketio.emit('scenario_ready', {
+            'name': scenario_name,
+            'action_count': len(scenario['actions'])
+        })
+    except Exception as e:
+        logging.error(f"Scenario {scenario_name} analysis failed: {e}")
+        scenario_status[scenario_name] = {'status': 'failed', 'error': str(e)}
+        socketio.emit('scenario_failed', {
+            'name': scenario_name,
+            'error': str(e)
+        })
 
 @app.route('/')
 def dashboard():
     """Main dashboard"""
-    return render_template_string('''
+    # Static page with no template variables; returned as-is so Flask skips Jinja
+    return '''
 <!DOCTYPE html>
 <html>
 <head>
@@ -439,7 +577,15 @@ def dashboard():
     <script>
         const socket = io();
         
+        // Active tests keyed by id; loaded once, then kept current by socket events
+        const activeTests = {};
+        
         // Socket event listeners
+        socket.on('test_started', function(test) {
+            activeTests[test.id] = test;
+            renderActiveTests();
+        });
+        
         socket.on('test_progress', function(data) {
             updateMetrics(data.test_id, data.metrics);
         });
@@ -449,6 +595,22 @@ def dashboard():
             alert('Test completed! Check the reports folder for detailed results.');
         });
         
+        socket.on('test_failed', function(data) {
+            updateTestStatus(data.test_id, 'failed');
+        });
+        
+        socket.on('scenario_ready', function(data) {
+            loadScenarios();
+            alert(`Video scenario "${data.name}" analyzed successfully!`);
+        });
+        
+        socket.on('scenario_failed', function(data) {
+            alert(`Analysis of "${data.name}" failed: ${data.error}`);
+        });
+        
+        // Events sent while disconnected are lost, so resync after a reconnect
+        socket.io.on('reconnect', loadActiveTests);
+        
         function uploadScenario() {
             const fileInput = document.getElementById('videoFile');
             const scenarioName = document.getElementById('scenarioName').value;
@@ -469,8 +631,7 @@ def dashboard():
             .then(response => response.json())
             .then(data => {
                 if (data.success) {
-                    alert('Video scenario analyzed successfully!');
-                    loadScenarios();
+                    alert('Video uploaded! Analysis is running in the background.');
                 } else {
                     alert('Error: ' + data.error);
                 }
@@ -500,7 +661,6 @@ def dashboard():
             .then(data => {
                 if (data.success) {
                     alert('Load test started! Test ID: ' + data.test_id);
-                    loadActiveTests();
                 } else {
                     alert('Error: ' + data.error);
                 }
@@ -527,19 +687,32 @@ def dashboard():
             fetch('/active_tests')
             .then(response => response.json())
             .then(data => {
-                const container = document.getElementById('activeTests');
-                container.innerHTML = '';
-                
-                Object.values(data).forEach(test => {
-                    const testDiv = document.createElement('div');
-                    testDiv.innerHTML = `
-                        <strong>Test ${test.id}</strong> - 
-                        <span class="status-${test.status}">${test.status}</span> - 
-                        Scenario: ${test.config.scenario} - 
-                        Users: ${test.config.concurrent_users}
-                    `;
-                    container.appendChild(testDiv);
-                });
+                Object.keys(activeTests).forEach(id => delete activeTests[id]);
+                Object.assign(activeTests, data);
+                renderActiveTests();
+            });
+        }
+        
+        function updateTestStatus(testId, status) {
+            if (activeTests[testId]) {
+                activeTests[testId].status = status;
+                renderActiveTests();
+            }
+        }
+        
+        function renderActiveTests() {
+            const container = document.getElementById('activeTests');
+            container.innerHTML = '';
+            
+            Object.values(activeTests).forEach(test => {
+                const testDiv = document.createElement('div');
+                testDiv.innerHTML = `
+                    <strong>Test ${test.id}</strong> - 
+                    <span class="status-${test.status}">${test.status}</span> - 
+                    Scenario: ${test.config.scenario} - 
+                    Users: ${test.config.concurrent_users}
+                `;
+                container.appendChild(testDiv);
             });
         }
         
@@ -565,16 +738,13 @@ def dashboard():
             `;
         }
         
-        // Load initial data
+        // Load initial data; later changes arrive over the socket
         loadScenarios();
         loadActiveTests();
-        
-        // Refresh active tests every 10 seconds
-        setInterval(loadActiveTests, 10000);
     </script>
 </body>
 </html>
-    ''')
+    '''
 
 @app.route('/upload_scenario', methods=['POST'])
 def upload_scenario():
@@ -594,11 +764,17 @@ def upload_scenario():
         video_path = f'videos/{scenario_name}_{int(time.time())}.mp4'
         video_file.save(video_path)
         
-        # Analyze video scenario
-        scenario = video_processor.analyze_video_scenario(video_path, scenario_name)
-        video_scenarios[scenario_name] = scenario
+        # Decoding can take minutes, so analyze in the background and push
+        # scenario_ready/scenario_failed over the socket when it finishes
+        scenario_status[scenario_name] = {'status': 'analyzing'}
+        analysis_executor.submit(_analyze_scenario_in_background, video_path, scenario_name)
         
-        return jsonify({'success': True, 'scenario': scenario})
+        return jsonify({
+            'success': True,
+            'status': 'analyzing',
+            'scenario_name': scenario_name,
+            'status_url': f'/scenario_status/{scenario_name}'
+        }), 202
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -607,7 +783,19 @@ def upload_scenario():
 def start_test():
     """Start load test"""
     try:
-        config = request.get_json()
+        config = request.get_json(silent=True)
+        if not isinstance(config, dict):
+            return jsonify({'success': False, 'error': 'JSON object body required'}), 400
+        
+        # A scenario uploaded moments ago may still be in analysis
+        analysis = scenario_status.get(config.get('scenario'), {})
+        if analysis.get('status') == 'analyzing':
+            return jsonify({'success': False, 'status': 'analyzing',
+                            'error': f"Scenario '{config['scenario']}' is still being analyzed"}), 409
+        if analysis.get('status') == 'failed':
+            return jsonify({'success': False, 'status': 'failed',
+                            'error': f"Scenario analysis failed: {analysis['error']}"}), 409
+        
         test_id = load_executor.execute_load_test(config)
         
         return jsonify({'success': True, 'test_id': test_id})
@@ -615,6 +803,18 @@ def start_test():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/scenario_status/<scenario_name>')
+def get_scenario_status(scenario_name):
+    """Get analysis status of an uploaded scenario"""
+    analysis = scenario_status.get(scenario_name)
+    if analysis is None:
+        return jsonify({'error': 'Scenario not found'}), 404
+    
+    status = dict(analysis, scenario_name=scenario_name)
+    if analysis['status'] == 'ready':
+        status['scenario'] = video_scenarios.get(scenario_name)
+    return jsonify(status)
+
 @app.route('/scenarios')
 def get_scenarios():
     """Get available scenarios"""
@@ -4,21 +4,41 @@ Mobile App Load Tester
 Test mobile game APIs and backends
 """
 
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, request, jsonify
 import requests
 import json
 import time
 import threading
+import itertools
 from datetime import datetime
 from typing import Dict, Any, List
-import base64
 import uuid
+from flask_compress import Compress
+from json_provider import ORJSONProvider
+from response_cache import TTLResponseCache, is_finished_test
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+# Compress the dashboard page and polled JSON (Brotli, gzip fallback)
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 512
+Compress(app)
+
+# Realistic mobile app headers, sent on every request from a simulated device
+MOBILE_HEADERS = {
+    'User-Agent': 'YourGame/1.0.0 (iPhone; iOS 15.0; Scale/3.00)',
+    'Accept': 'application/json',
+    'Content-Type': 'application/json',
+    'X-Platform': 'iOS',
+    'X-App-Version': '1.0.0',
+    'X-Device-Type': 'iPhone13,2'
+}
 
 class MobileAppLoadTester:
     def __init__(self):
         self.active_tests = {}
+        # Sequence suffix keeps test ids unique when tests start in the same second
+        self.test_ids = itertools.count(1)
         
     def create_mobile_scenarios(self, app_info: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Create mobile app specific scenarios"""
@@ -36,7 +56,7 @@ class MobileAppLoadTester:
                     'method': 'POST',
                     'endpoint': '/api/v1/app/launch',
                     'delay': 2.0,
-                    'headers': self._get_mobile_headers(),
+                    'headers': dict(MOBILE_HEADERS),
                     'payload': {
                         'device_id': '{device_id}',
                         'app_version': '1.0.0',
@@ -115,20 +135,9 @@ class MobileAppLoadTester:
         
         return scenarios
     
-    def _get_mobile_headers(self) -> Dict[str, str]:
-        """Generate realistic mobile app headers"""
-        return {
-            'User-Agent': 'YourGame/1.0.0 (iPhone; iOS 15.0; Scale/3.00)',
-            'Accept': 'application/json',
-            'Content-Type': 'application/json',
-            'X-Platform': 'iOS',
-            'X-App-Version': '1.0.0',
-            'X-Device-Type': 'iPhone13,2'
-        }
-    
     def run_mobile_load_test(self, config: Dict[str, Any]) -> str:
         """Run mobile app load test"""
-        test_id = f"mobile_test_{int(time.time())}"
+        test_id = f"mobile_test_{int(time.time())}_{next(self.test_ids)}"
         
         test_session = {
             'id': test_id,
@@ -157,6 +166,7 @@ class MobileAppLoadTester:
     
     def _execute_mobile_test(self, test_id: str, config: Dict[str, Any]):
         """Execute mobile load test"""
+        device_threads = []
         try:
             base_url = config['api_base_url']
             scenario = config['scenario']
@@ -164,8 +174,6 @@ class MobileAppLoadTester:
             duration = config.get('duration', 300)
             
             # Create device simulation threads
-            device_threads = []
-            
             for device_id in range(concurrent_devices):
                 thread = threading.Thread(
                     target=self._simulate_mobile_device,
@@ -188,12 +196,20 @@ class MobileAppLoadTester:
             self.active_tests[test_id]['status'] = 'completed'
             
         except Exception as e:
-            self.active_tests[test_id]['status'] = 'failed'
             self.active_tests[test_id]['error'] = str(e)
+            self.active_tests[test_id]['status'] = 'failed'
+        finally:
+            # Workers can outlive a timed join or a failure; the test's JSON
+            # is only cached once every one of them has exited
+            for thread in device_threads:
+                thread.join()
+            self.active_tests[test_id]['finalized'] = True
     
     def _simulate_mobile_device(self, test_id: str, device_id: int, base_url: str, scenario: Dict, duration: float):
         """Simulate a single mobile device"""
         session = requests.Session()
+        # Mobile headers are the same for every action, so set them once per device
+        session.headers.update(MOBILE_HEADERS)
         
         # Generate unique device info
         device_uuid = str(uuid.uuid4())
@@ -218,7 +234,7 @@ class MobileAppLoadTester:
                     try:
                         response_data = json.loads(result.get('response_body', '{}'))
                         auth_token = response_data.get('access_token') or response_data.get('token')
-                    except:
+                    except (ValueError, TypeError):
                         pass
                 
                 time.sleep(action.get('delay', 1.0))
@@ -239,6 +255,8 @@ class MobileAppLoadTester:
         # Add auth token to headers if available
         if auth_token and 'headers' in prepared:
             if 'Authorization' in prepared['headers']:
+                # Copy first; the scenario's headers dict is shared by every device
+                prepared['headers'] = dict(prepared['headers'])
                 prepared['headers']['Authorization'] = prepared['headers']['Authorization'].replace('{auth_token}', auth_token)
         
         return prepared
@@ -250,13 +268,10 @@ class MobileAppLoadTester:
         try:
             url = f"{base_url.rstrip('/')}{action['endpoint']}"
             method = action.get('method', 'GET').upper()
-            headers = action.get('headers', {})
+            # Mobile headers come from the session; only action-specific ones here
+            headers = action.get('headers')
             payload = action.get('payload', {})
             
-            # Add mobile headers
-            mobile_headers = self._get_mobile_headers()
-            headers.update(mobile_headers)
-            
             if method == 'POST':
                 response = session.post(url, json=payload, headers=headers, timeout=10)
             else:
@@ -295,15 +310,27 @@ class MobileAppLoadTester:
         if not results:
             return
         
-        total_requests = len(results)
-        successful_requests = sum(1 for r in results if r['success'])
-        failed_requests = total_requests - successful_requests
-        
-        response_times = [r['response_time'] for r in results if r['response_time'] > 0]
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
+        # Single pass with running totals instead of intermediate lists
+        total_requests = 0
+        successful_requests = 0
+        response_time_total = 0.0
+        response_time_count = 0
+        auth_failures = 0
+        device_ids = set()
+        for r in results:
+            total_requests += 1
+            if r['success']:
+                successful_requests += 1
+            elif 'login' in r['action'].lower():
+                auth_failures += 1
+            if r['response_time'] > 0:
+                response_time_total += r['response_time']
+                response_time_count += 1
+            device_ids.add(r['device_id'])
         
-        auth_failures = sum(1 for r in results if 'login' in r['action'].lower() and not r['success'])
-        device_simulations = len(set(r['device_id'] for r in results))
+        failed_requests = total_requests - successful_requests
+        avg_response_time = response_time_total / response_time_count if response_time_count else 0
+        device_simulations = len(device_ids)
         
         test_session['metrics'].update({
             'total_requests': total_requests,
@@ -316,10 +343,14 @@ class MobileAppLoadTester:
 
 mobile_tester = MobileAppLoadTester()
 
+# Dashboards poll the test list; share one serialized snapshot per second
+active_tests_cache = TTLResponseCache()
+
 @app.route('/')
 def mobile_dashboard():
     """Mobile App Testing Dashboard"""
-    return render_template_string('''
+    # Static page with no template variables; returned as-is so Flask skips Jinja
+    return '''
 <!DOCTYPE html>
 <html>
 <head>
@@ -479,13 +510,15 @@ def mobile_dashboard():
     </script>
 </body>
 </html>
-    ''')
+    '''
 
 @app.route('/start_mobile_test', methods=['POST'])
 def start_mobile_test():
     """Start mobile app load test"""
     try:
-        config = request.get_json()
+        config = request.get_json(silent=True)
+        if not isinstance(config, dict):
+            return jsonify({'success': False, 'error': 'JSON object body required'}), 400
         
         # Create scenario based on type
         app_info = {'api_base_url': config['api_base_url']}
@@ -499,6 +532,7 @@ def start_mobile_test():
         config['scenario'] = scenario_map.get(config['scenario_type'], scenarios[0])
         
         test_id = mobile_tester.run_mobile_load_test(config)
+        active_tests_cache.invalidate()
         return jsonify({'success': True, 'test_id': test_id})
         
     except Exception as e:
@@ -507,7 +541,7 @@ def start_mobile_test():
 @app.route('/mobile_tests')
 def get_mobile_tests():
     """Get active mobile tests"""
-    return jsonify(mobile_tester.active_tests)
+    return active_tests_cache.json_response(lambda: mobile_tester.active_tests, is_finished_test)
 
 if __name__ == '__main__':
     print("📱 Starting Mobile App Load Tester...")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Response Cache
+Short-lived cache for the JSON endpoints that dashboards poll
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from flask import Response, current_app
+
+def is_finished_test(test: Dict) -> bool:
+    """Tests are no longer updated once all their workers have exited"""
+    return test.get('finalized', False)
+
+class TTLResponseCache:
+    """Serve one serialized snapshot to every poll within a short window"""
+    
+    def __init__(self, ttl: float = 1.0):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.body = None
+        self.expires_at = 0.0
+        # Encoded form of records that can no longer change, keyed by id
+        self.finished_records = {}
+    
+    def json_response(self, build: Callable[[], Any],
+                      is_finished: Optional[Callable[[Dict], bool]] = None) -> Response:
+        """Return build() as JSON, serializing it at most once per ttl
+        
+        When is_finished is given, build() must return a dict of records and
+        records it accepts are encoded once and reused on later refreshes.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.body is None or now >= self.expires_at:
+                data = build()
+                if is_finished is None:
+                    self.body = current_app.json.dumps(data)
+                else:
+                    self.body = self._encode_records(data, is_finished)
+                self.expires_at = now + self.ttl
+            body = self.body
+        
+        return current_app.response_class(body, mimetype='application/json')
+    
+    def _encode_records(self, records: Dict[str, Dict], is_finished: Callable[[Dict], bool]) -> str:
+        """Encode a dict of records, re-encoding only the ones still changing"""
+        dumps = current_app.json.dumps
+        parts = []
+        # Snapshot the items; worker threads add records while we encode
+        items = list(records.items())
+        # Forget encodings of records that have been removed
+        stale = self.finished_records.keys() - {key for key, _ in items}
+        for key in stale:
+            del self.finished_records[key]
+        
+        for key, record in items:
+            encoded = self.finished_records.get(key)
+            if encoded is None:
+                # Check before encoding so a record finalized mid-encode is
+                # not cached in its earlier state
+                finished = is_finished(record)
+                encoded = dumps(record)
+                if finished:
+                    self.finished_records[key] = encoded
+            parts.append(f'{dumps(key)}:{encoded}')
+        return '{' + ','.join(parts) + '}'
+    
+    def invalidate(self, records: bool = False):
+        """Drop the snapshot so the next poll sees a change immediately
+        
+        Pass records=True when the underlying records were replaced wholesale.
+        """
+        with self.lock:
+            self.body = None
+            if records:
+                self.finished_records.clear()
@@ -7,24 +7,33 @@ Simple alternative to BrowserStack for immediate testing
 import time
 import subprocess
 import threading
-import json
+import itertools
 import requests
 from datetime import datetime
 from typing import Dict, List, Any
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, request, jsonify
 import psutil
-import os
+from flask_compress import Compress
+from json_provider import ORJSONProvider
+from response_cache import TTLResponseCache, is_finished_test
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+# Compress the dashboard page and polled JSON (Brotli, gzip fallback)
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 512
+Compress(app)
 
 class ScriptLoadTimer:
     def __init__(self):
         self.active_tests = {}
+        # Sequence suffix keeps test ids unique when tests start in the same second
+        self.test_ids = itertools.count(1)
         self.script_results = {}
     
     def run_script_load_test(self, config: Dict[str, Any]) -> str:
         """Run load test with custom scripts"""
-        test_id = f"script_test_{int(time.time())}"
+        test_id = f"script_test_{int(time.time())}_{next(self.test_ids)}"
         
         test_session = {
             'id': test_id,
@@ -54,6 +63,7 @@ class ScriptLoadTimer:
     
     def _execute_script_test(self, test_id: str, config: Dict[str, Any]):
         """Execute script load test"""
+        script_threads = []
         try:
             script_path = config['script_path']
             concurrent_instances = config.get('concurrent_instances', 5)
@@ -61,8 +71,6 @@ class ScriptLoadTimer:
             script_args = config.get('script_args', [])
             
             # Create concurrent script execution threads
-            script_threads = []
-            
             for i in range(concurrent_instances):
                 thread = threading.Thread(
                     target=self._run_script_instance,
@@ -81,8 +89,14 @@ class ScriptLoadTimer:
             self.active_tests[test_id]['status'] = 'completed'
             
         except Exception as e:
-            self.active_tests[test_id]['status'] = 'failed'
             self.active_tests[test_id]['error'] = str(e)
+            self.active_tests[test_id]['status'] = 'failed'
+        finally:
+            # Workers can outlive a timed join or a failure; the test's JSON
+            # is only cached once every one of them has exited
+            for thread in script_threads:
+                thread.join()
+            self.active_tests[test_id]['finalized'] = True
     
     def _run_script_instance(self, test_id: str, instance_id: int, script_path: str, script_args: List[str], duration: int):
         """Run a single script instance"""
@@ -186,23 +200,33 @@ class ScriptLoadTimer:
         """Calculate final script test metrics"""
         results = self.active_tests[test_id]['results']
         
+        # Accumulate counts, timing stats and sample outputs in one pass
         total_runs = len(results)
-        successful_runs = sum(1 for r in results if r.get('success', False))
-        failed_runs = total_runs - successful_runs
+        successful_runs = 0
+        timed_runs = 0
+        time_total = 0
+        min_execution_time = 0
+        max_execution_time = 0
+        sample_outputs = []
         
-        execution_times = [r['execution_time'] for r in results if r.get('success', False) and r['execution_time'] > 0]
+        for r in results:
+            if r.get('success', False):
+                successful_runs += 1
+                execution_time = r['execution_time']
+                if execution_time > 0:
+                    if timed_runs == 0 or execution_time < min_execution_time:
+                        min_execution_time = execution_time
+                    if execution_time > max_execution_time:
+                        max_execution_time = execution_time
+                    time_total += execution_time
+                    timed_runs += 1
+            
+            # Get sample outputs
+            if len(sample_outputs) < 5 and r.get('stdout'):
+                sample_outputs.append(r['stdout'])
         
-        if execution_times:
-            avg_execution_time = sum(execution_times) / len(execution_times)
-            min_execution_time = min(execution_times)
-            max_execution_time = max(execution_times)
-        else:
-            avg_execution_time = 0
-            min_execution_time = 0
-            max_execution_time = 0
-        
-        # Get sample outputs
-        sample_outputs = [r.get('stdout', '') for r in results if r.get('stdout')][:5]
+        failed_runs = total_runs - successful_runs
+        avg_execution_time = time_total / timed_runs if timed_runs else 0
         
         self.active_tests[test_id]['metrics'].update({
             'total_runs': total_runs,
@@ -216,7 +240,7 @@ class ScriptLoadTimer:
     
     def run_url_load_test(self, config: Dict[str, Any]) -> str:
         """Run simple URL load test without BrowserStack"""
-        test_id = f"url_test_{int(time.time())}"
+        test_id = f"url_test_{int(time.time())}_{next(self.test_ids)}"
         
         test_session = {
             'id': test_id,
@@ -245,14 +269,13 @@ class ScriptLoadTimer:
     
     def _execute_url_test(self, test_id: str, config: Dict[str, Any]):
         """Execute URL load test"""
+        user_threads = []
         try:
             target_url = config['target_url']
             concurrent_users = config.get('concurrent_users', 10)
             test_duration = config.get('test_duration', 300)
             
             # Create concurrent request threads
-            user_threads = []
-            
             for i in range(concurrent_users):
                 thread = threading.Thread(
                     target=self._run_url_requests,
@@ -271,8 +294,14 @@ class ScriptLoadTimer:
             self.active_tests[test_id]['status'] = 'completed'
             
         except Exception as e:
-            self.active_tests[test_id]['status'] = 'failed'
             self.active_tests[test_id]['error'] = str(e)
+            self.active_tests[test_id]['status'] = 'failed'
+        finally:
+            # Workers can outlive a timed join or a failure; the test's JSON
+            # is only cached once every one of them has exited
+            for thread in user_threads:
+                thread.join()
+            self.active_tests[test_id]['finalized'] = True
     
     def _run_url_requests(self, test_id: str, user_id: int, url: str, duration: int):
         """Run URL requests for a single user"""
@@ -342,20 +371,28 @@ class ScriptLoadTimer:
         """Calculate URL test metrics"""
         results = self.active_tests[test_id]['results']
         
+        # Accumulate counts and timing stats in one pass
         total_requests = len(results)
-        successful_requests = sum(1 for r in results if r.get('success', False))
-        failed_requests = total_requests - successful_requests
+        successful_requests = 0
+        timed_requests = 0
+        time_total = 0
+        min_response_time = 0
+        max_response_time = 0
         
-        response_times = [r['response_time'] for r in results if r.get('success', False) and r['response_time'] > 0]
+        for r in results:
+            if r.get('success', False):
+                successful_requests += 1
+                response_time = r['response_time']
+                if response_time > 0:
+                    if timed_requests == 0 or response_time < min_response_time:
+                        min_response_time = response_time
+                    if response_time > max_response_time:
+                        max_response_time = response_time
+                    time_total += response_time
+                    timed_requests += 1
         
-        if response_times:
-            avg_response_time = sum(response_times) / len(response_times)
-            min_response_time = min(response_times)
-            max_response_time = max(response_times)
-        else:
-            avg_response_time = 0
-            min_response_time = 0
-            max_response_time = 0
+        failed_requests = total_requests - successful_requests
+        avg_response_time = time_total / timed_requests if timed_requests else 0
         
         self.active_tests[test_id]['metrics'].update({
             'total_requests': total_requests,
@@ -369,10 +406,14 @@ class ScriptLoadTimer:
 # Global script timer instance
 script_timer = ScriptLoadTimer()
 
+# Dashboards poll the test list; share one serialized snapshot per second
+active_tests_cache = TTLResponseCache()
+
 @app.route('/')
 def script_dashboard():
     """Script Load Timer Dashboard"""
-    return render_template_string('''
+    # Static page with no template variables; returned as-is so Flask skips Jinja
+    return '''
 <!DOCTYPE html>
 <html>
 <head>
@@ -643,14 +684,17 @@ def script_dashboard():
     </script>
 </body>
 </html>
-    ''')
+    '''
 
 @app.route('/start_script_test', methods=['POST'])
 def start_script_test():
     """Start script load test"""
     try:
-        config = request.get_json()
+        config = request.get_json(silent=True)
+        if not isinstance(config, dict):
+            return jsonify({'success': False, 'error': 'JSON object body required'}), 400
         test_id = script_timer.run_script_load_test(config)
+        active_tests_cache.invalidate()
         return jsonify({'success': True, 'test_id': test_id})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -659,8 +703,11 @@ def start_script_test():
 def start_url_test():
     """Start URL load test"""
     try:
-        config = request.get_json()
+        config = request.get_json(silent=True)
+        if not isinstance(config, dict):
+            return jsonify({'success': False, 'error': 'JSON object body required'}), 400
         test_id = script_timer.run_url_load_test(config)
+        active_tests_cache.invalidate()
         return jsonify({'success': True, 'test_id': test_id})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
@@ -668,7 +715,7 @@ def start_url_test():
 @app.route('/script_tests')
 def get_script_tests():
     """Get active script tests"""
-    return jsonify(script_timer.active_tests)
+    return active_tests_cache.json_response(lambda: script_timer.active_tests, is_finished_test)
 
 if __name__ == '__main__':
     print("⚡ Starting Script Load Timer...")
@@ -4,18 +4,31 @@ Simple Video-Based Load Testing System
 Simplified version without complex video processing dependencies
 """
 
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, request, jsonify
 import threading
+import itertools
 import time
 import json
 import requests
 import os
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, Any
 import queue
 import logging
+from flask_compress import Compress
+from json_provider import ORJSONProvider
+from response_cache import TTLResponseCache, is_finished_test
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+# Compress the dashboard page and polled JSON (Brotli, gzip fallback)
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 512
+Compress(app)
+
+# Buffer size for writing JSON test reports
+REPORT_WRITE_BUFFER = 1 << 20
 
 # Global state
 test_sessions = {}
@@ -25,11 +38,16 @@ active_tests = {}
 class SimpleLoadExecutor:
     def __init__(self):
         self.active_tests = {}
-        self.results_queue = queue.Queue()
+        # Sequence suffix keeps test ids unique when tests start in the same second
+        self.test_ids = itertools.count(1)
+        # User threads only enqueue finished sessions; each test's monitor
+        # loop drains its queue in batches and keeps running totals
+        self.result_queues = {}
+        self.metric_totals = {}
         
     def execute_load_test(self, test_config: Dict[str, Any]) -> str:
         """Execute load test based on scenario"""
-        test_id = f"test_{int(time.time())}"
+        test_id = f"test_{int(time.time())}_{next(self.test_ids)}"
         
         test_session = {
             'id': test_id,
@@ -47,6 +65,14 @@ class SimpleLoadExecutor:
         }
         
         self.active_tests[test_id] = test_session
+        self.result_queues[test_id] = queue.SimpleQueue()
+        self.metric_totals[test_id] = {
+            'successful_sessions': 0,
+            'response_time_total': 0.0,
+            'response_time_count': 0,
+            # Only the last 10 errors are reported, so keep no more than that
+            'errors': deque(maxlen=10)
+        }
         
         # Start test in background thread
         thread = threading.Thread(
@@ -60,6 +86,7 @@ class SimpleLoadExecutor:
     
     def _run_test_scenario(self, test_id: str, config: Dict[str, Any]):
         """Run the actual load test scenario"""
+        user_threads = []
         try:
             scenario_name = config['scenario']
             concurrent_users = config.get('concurrent_users', 10)
@@ -70,8 +97,6 @@ class SimpleLoadExecutor:
             scenario = self._get_default_scenario(scenario_name)
             
             # Create user simulation threads
-            user_threads = []
-            
             for user_id in range(concurrent_users):
                 # Stagger user start times for realistic ramp-up
                 start_delay = (ramp_up_time / concurrent_users) * user_id
@@ -98,9 +123,20 @@ class SimpleLoadExecutor:
             self._finalize_test(test_id)
             
         except Exception as e:
-            self.active_tests[test_id]['status'] = 'failed'
             self.active_tests[test_id]['error'] = str(e)
+            self.active_tests[test_id]['status'] = 'failed'
             logging.error(f"Test {test_id} failed: {e}")
+        finally:
+            # Workers can outlive a timed join or a failure; the test's JSON
+            # is only cached once every one of them has exited
+            for thread in user_threads:
+                thread.join()
+            # Fold in sessions that finished after the report was written,
+            # then drop the per-test queue and totals
+            self._update_test_metrics(test_id)
+            self.result_queues.pop(test_id, None)
+            self.metric_totals.pop(test_id, None)
+            self.active_tests[test_id]['finalized'] = True
     
     def _get_default_scenario(self, scenario_name: str) -> Dict[str, Any]:
         """Get default scenario if video analysis isn't available"""
@@ -140,6 +176,10 @@ class SimpleLoadExecutor:
         """Simulate a single user session"""
         time.sleep(start_delay)
         
+        # One session per simulated user so its actions reuse a keep-alive
+        # connection, like a real client would
+        session = requests.Session()
+        
         session_start = time.time()
         session_result = {
             'user_id': user_id,
@@ -155,7 +195,7 @@ class SimpleLoadExecutor:
             
             # Execute actions from scenario
             for action in scenario['actions']:
-                action_result = self._execute_action(action, base_url, user_id)
+                action_result = self._execute_action(session, action, base_url, user_id)
                 session_result['actions'].append(action_result)
                 
                 if not action_result['success']:
@@ -172,11 +212,12 @@ class SimpleLoadExecutor:
             session_result['success'] = False
             session_result['total_time'] = time.time() - session_start
         
+        session.close()
+        
         # Store results
-        self.active_tests[test_id]['results'].append(session_result)
-        self.results_queue.put((test_id, session_result))
+        self.result_queues[test_id].put(session_result)
     
-    def _execute_action(self, action: Dict, base_url: str, user_id: int) -> Dict[str, Any]:
+    def _execute_action(self, session: requests.Session, action: Dict, base_url: str, user_id: int) -> Dict[str, Any]:
         """Execute a specific action"""
         action_start = time.time()
         
@@ -184,12 +225,12 @@ class SimpleLoadExecutor:
             endpoint = action['endpoint']
             
             if action['type'] == 'login':
-                response = requests.post(f"{base_url}{endpoint}", json={
+                response = session.post(f"{base_url}{endpoint}", json={
                     'username': f'test_user_{user_id}',
                     'password': 'test_password'
                 }, timeout=10)
             else:
-                response = requests.get(f"{base_url}{endpoint}", timeout=10)
+                response = session.get(f"{base_url}{endpoint}", timeout=10)
             
             return {
                 'type': action['type'],
@@ -212,34 +253,47 @@ class SimpleLoadExecutor:
         """Update test metrics in real-time"""
         test_session = self.active_tests[test_id]
         results = test_session['results']
+        result_queue = self.result_queues[test_id]
+        totals = self.metric_totals[test_id]
         
-        if not results:
+        # Fold in only the sessions finished since the last update
+        new_results = 0
+        while not result_queue.empty():
+            r = result_queue.get_nowait()
+            results.append(r)
+            new_results += 1
+            if r['success']:
+                totals['successful_sessions'] += 1
+            if r['total_time'] > 0:
+                totals['response_time_total'] += r['total_time']
+                totals['response_time_count'] += 1
+            totals['errors'].extend(r['errors'])
+        
+        if not new_results:
             return
         
         total_users = len(results)
-        successful_sessions = sum(1 for r in results if r['success'])
+        successful_sessions = totals['successful_sessions']
         failed_sessions = total_users - successful_sessions
-        
-        response_times = [r['total_time'] for r in results if r['total_time'] > 0]
-        avg_response_time = sum(response_times) / len(response_times) if response_times else 0
-        
-        all_errors = []
-        for r in results:
-            all_errors.extend(r['errors'])
+        response_time_count = totals['response_time_count']
+        avg_response_time = totals['response_time_total'] / response_time_count if response_time_count else 0
         
         test_session['metrics'].update({
             'total_users': total_users,
             'successful_sessions': successful_sessions,
             'failed_sessions': failed_sessions,
             'avg_response_time': avg_response_time,
-            'errors': all_errors[-10:]  # Keep last 10 errors
+            'errors': list(totals['errors'])  # Keep last 10 errors
         })
     
     def _finalize_test(self, test_id: str):
         """Finalize test and generate report"""
+        # Pick up sessions that finished after the last monitor tick
+        self._update_test_metrics(test_id)
+        
         test_session = self.active_tests[test_id]
-        test_session['status'] = 'completed'
         test_session['end_time'] = datetime.now().isoformat()
+        test_session['status'] = 'completed'
         
         # Generate detailed report
         self._generate_test_report(test_id)
@@ -257,18 +311,27 @@ class SimpleLoadExecutor:
             'generated_at': datetime.now().isoformat()
         }
         
-        # Save report to file
+        # Save report to file (large buffer so json.dump's many small
+        # chunks for the full timeline coalesce into a few writes).
+        # Write to a temp file and rename so readers never see a partial report.
         os.makedirs('reports', exist_ok=True)
-        with open(f'reports/test_report_{test_id}.json', 'w') as f:
+        report_path = f'reports/test_report_{test_id}.json'
+        tmp_path = f'{report_path}.tmp'
+        with open(tmp_path, 'w', buffering=REPORT_WRITE_BUFFER) as f:
             json.dump(report, f, indent=2)
+        os.replace(tmp_path, report_path)
 
 # Initialize components
 load_executor = SimpleLoadExecutor()
 
+# Dashboards poll the test list; share one serialized snapshot per second
+active_tests_cache = TTLResponseCache()
+
 @app.route('/')
 def dashboard():
     """Main dashboard"""
-    return render_template_string('''
+    # Static page with no template variables; returned as-is so Flask skips Jinja
+    return '''
 <!DOCTYPE html>
 <html>
 <head>
@@ -314,7 +377,7 @@ def dashboard():
         
         <div class="section">
             <h2>📊 Active Tests</h2>
-            <div id="activeTests">No active tests</div>
+            <div id="activeTests"><div id="noActiveTests">No active tests</div></div>
         </div>
         
         <div class="section">
@@ -371,72 +434,104 @@ def dashboard():
             });
         }
         
+        // Rendered test rows keyed by test id, patched in place on each refresh
+        const testRows = new Map();
+        
         function loadActiveTests() {
+            // One fetch feeds both the test list and the metric cards
             fetch('/active_tests')
             .then(response => response.json())
             .then(data => {
-                const container = document.getElementById('activeTests');
-                container.innerHTML = '';
-                
-                if (Object.keys(data).length === 0) {
-                    container.innerHTML = 'No active tests';
-                    return;
+                renderActiveTests(data);
+                updateMetrics(data);
+            });
+        }
+        
+        function renderActiveTests(data) {
+            const container = document.getElementById('activeTests');
+            
+            // Remove rows for tests that are no longer reported
+            testRows.forEach((row, id) => {
+                if (!(id in data)) {
+                    row.remove();
+                    testRows.delete(id);
+                }
+            });
+            
+            Object.values(data).forEach(test => {
+                let row = testRows.get(test.id);
+                if (!row) {
+                    row = createTestRow(test);
+                    testRows.set(test.id, row);
+                    container.appendChild(row);
                 }
                 
-                Object.values(data).forEach(test => {
-                    const testDiv = document.createElement('div');
-                    testDiv.style.cssText = 'padding: 15px; margin: 10px 0; background: #f8f9fa; border-radius: 5px; border-left: 4px solid #007bff;';
-                    testDiv.innerHTML = `
-                        <strong>Test ${test.id}</strong> - 
-                        <span class="status-${test.status}">${test.status.toUpperCase()}</span><br>
-                        <small>Scenario: ${test.config.scenario} | Users: ${test.config.concurrent_users} | Started: ${new Date(test.start_time).toLocaleTimeString()}</small>
-                    `;
-                    container.appendChild(testDiv);
-                });
+                // Only the status changes after a test starts
+                const status = row.querySelector('.test-status');
+                const statusText = test.status.toUpperCase();
+                if (status.textContent !== statusText) {
+                    status.className = 'test-status status-' + test.status;
+                    status.textContent = statusText;
+                }
             });
+            
+            document.getElementById('noActiveTests').style.display = testRows.size === 0 ? '' : 'none';
         }
         
-        function updateMetrics() {
-            fetch('/active_tests')
-            .then(response => response.json())
-            .then(data => {
-                let totalUsers = 0, successful = 0, failed = 0, avgTime = 0;
-                
-                Object.values(data).forEach(test => {
-                    if (test.metrics) {
-                        totalUsers += test.metrics.total_users || 0;
-                        successful += test.metrics.successful_sessions || 0;
-                        failed += test.metrics.failed_sessions || 0;
-                        avgTime = Math.max(avgTime, test.metrics.avg_response_time || 0);
-                    }
-                });
-                
-                document.querySelector('.metrics .metric-card:nth-child(1) .metric-value').textContent = totalUsers;
-                document.querySelector('.metrics .metric-card:nth-child(2) .metric-value').textContent = successful;
-                document.querySelector('.metrics .metric-card:nth-child(3) .metric-value').textContent = failed;
-                document.querySelector('.metrics .metric-card:nth-child(4) .metric-value').textContent = avgTime.toFixed(1) + 's';
+        function createTestRow(test) {
+            const row = document.createElement('div');
+            row.style.cssText = 'padding: 15px; margin: 10px 0; background: #f8f9fa; border-radius: 5px; border-left: 4px solid #007bff;';
+            
+            const title = document.createElement('strong');
+            title.textContent = `Test ${test.id}`;
+            
+            const status = document.createElement('span');
+            status.className = 'test-status';
+            
+            const details = document.createElement('small');
+            details.textContent = `Scenario: ${test.config.scenario} | Users: ${test.config.concurrent_users} | Started: ${new Date(test.start_time).toLocaleTimeString()}`;
+            
+            row.append(title, ' - ', status, document.createElement('br'), details);
+            return row;
+        }
+        
+        function updateMetrics(data) {
+            let totalUsers = 0, successful = 0, failed = 0, avgTime = 0;
+            
+            Object.values(data).forEach(test => {
+                if (test.metrics) {
+                    totalUsers += test.metrics.total_users || 0;
+                    successful += test.metrics.successful_sessions || 0;
+                    failed += test.metrics.failed_sessions || 0;
+                    avgTime = Math.max(avgTime, test.metrics.avg_response_time || 0);
+                }
             });
+            
+            document.querySelector('.metrics .metric-card:nth-child(1) .metric-value').textContent = totalUsers;
+            document.querySelector('.metrics .metric-card:nth-child(2) .metric-value').textContent = successful;
+            document.querySelector('.metrics .metric-card:nth-child(3) .metric-value').textContent = failed;
+            document.querySelector('.metrics .metric-card:nth-child(4) .metric-value').textContent = avgTime.toFixed(1) + 's';
         }
         
         // Auto-refresh every 5 seconds
-        setInterval(() => {
-            loadActiveTests();
-            updateMetrics();
-        }, 5000);
+        setInterval(loadActiveTests, 5000);
         
         // Initial load
         loadActiveTests();
     </script>
 </body>
 </html>
-    ''')
+    '''
 
 @app.route('/start_test', methods=['POST'])
 def start_test():
     """Start load test"""
     try:
-        config = request.get_json()
+        config = request.get_json(silent=True)
+        if not isinstance(config, dict):
+            return jsonify({'success': False, 'error': 'JSON object body required'}), 400
         test_id = load_executor.execute_load_test(config)
+        active_tests_cache.invalidate()
         
         return jsonify({'success': True, 'test_id': test_id})
         
@@ -446,7 +541,7 @@ def start_test():
 @app.route('/active_tests')
 def get_active_tests():
     """Get active tests"""
-    return jsonify(load_executor.active_tests)
+    return active_tests_cache.json_response(lambda: load_executor.active_tests, is_finished_test)
 
 @app.route('/test_results/<test_id>')
 def get_test_results(test_id):